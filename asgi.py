@@ -0,0 +1,75 @@
+"""ASGI entry point for Elite Football Tracker.
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT [--workers N]
+
+Serves the same Flask app (templates, data.py processing, snapshot store) from
+an event loop. Views run on a pool of ASGI_THREADS threads and mostly just
+render the cached snapshot; background refreshes read Google Sheets with a
+non-blocking httpx client on the event loop (sheets.get_all_data_async), so a
+slow Google call holds no thread and the process keeps serving page views while
+refreshes are in flight. Only processing the fetched data runs in a thread.
+
+A request that finds no usable snapshot at all (cold start, hard expiry, after a
+write was invalidated) still loads inline on its view thread, as under gunicorn.
+"""
+import asyncio
+import os
+import time
+
+import httpx
+from a2wsgi import WSGIMiddleware
+
+import flask_app
+import metrics
+import snapshot_store
+from sheets import SHEETS_TIMEOUT, get_all_data_async
+
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 32))  # threads running Flask views
+
+_state = {"loop": None, "client": None}
+_wsgi = WSGIMiddleware(flask_app.app, workers=ASGI_THREADS)
+
+
+async def _refresh(done):
+    """Fetch the sheet on the event loop, then process and publish it in a thread."""
+    try:
+        # Read before the fetch, so a write landing while it is awaited isn't published over
+        generation = (await asyncio.to_thread(snapshot_store.read_state))["generation"]
+        if flask_app.breaker_allows_request():
+            start = time.perf_counter()
+            sheet_data = await get_all_data_async(_state["client"])
+            metrics.observe_sheets_call("read", time.perf_counter() - start, not sheet_data[3])
+        else:
+            sheet_data = None  # refresh_cache() serves the degraded snapshot without a fetch
+        await asyncio.to_thread(flask_app.refresh_cache, sheet_data, generation)
+    except Exception as e:
+        flask_app.app.logger.warning("Background refresh failed: %s", e)
+    finally:
+        done()
+
+
+def schedule_refresh(done):
+    """flask_app.async_refresher: called from a view thread, runs the refresh on the event loop."""
+    asyncio.run_coroutine_threadsafe(_refresh(done), _state["loop"])
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            _state["loop"] = asyncio.get_running_loop()
+            _state["client"] = httpx.AsyncClient(timeout=SHEETS_TIMEOUT)
+            flask_app.async_refresher = schedule_refresh
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            flask_app.async_refresher = None
+            await _state["client"].aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    else:
+        await _wsgi(scope, receive, send)
@@ -1,10 +1,159 @@
 """Data processing module for Elite Football Tracker.
-Handles competition dict building and martingale betting cycle logic.
+Handles competition dict building, martingale betting cycle logic and the
+write-through patching of processed snapshots.
 """
+import bisect
+import datetime
+import functools
+
+import numpy as np
 import pandas as pd
 
+from metrics import track_process_data
+from server_timing import phase
+
 DEFAULT_STAKE = 30.0
 
+# ISO first (what the app writes), then day-first formats (dates are entered as DD/MM/YYYY)
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%d-%m-%Y",
+    "%d/%m/%y",
+    "%d.%m.%y",
+    "%Y/%m/%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+)
+
+PARSED_DATES_CACHE_SIZE = 4096  # distinct date strings remembered by parse_date
+RESULT_TEXTS_CACHE_SIZE = 256  # distinct unseen Result strings remembered by classify_result
+
+# Compact result codes; the processed Status column is a categorical whose codes are these values
+RESULT_PENDING = 0
+RESULT_WON = 1
+RESULT_LOST = 2
+STATUS_LABELS = ("Pending", "Won", "Lost")
+
+# Result values the app writes
+MATCH_RESULTS = ("Pending", "Draw (X)", "No Draw")
+
+# Raw Result cell -> result code for the values the app writes (and an empty cell)
+_result_codes = {
+    "": RESULT_PENDING,
+    "Pending": RESULT_PENDING,
+    "Draw (X)": RESULT_WON,
+    "No Draw": RESULT_LOST,
+}
+
+# Repeated string columns stored as pandas categoricals in the processed frame
+CATEGORICAL_COLUMNS = ("Comp", "Home", "Away")
+
+
+def parse_date(value):
+    """Parse a sheet date string, trying each of DATE_FORMATS. Returns None if unparseable."""
+    return _parse_date_text(str(value or '').strip())
+
+
+@functools.lru_cache(maxsize=PARSED_DATES_CACHE_SIZE)
+def _parse_date_text(text):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def classify_result(result):
+    """Map a raw Result cell to a RESULT_* code using the lookup table (text rules for unseen values)."""
+    code = _result_codes.get(result)
+    if code is not None:
+        return code
+    return _classify_result_text(result)
+
+
+@functools.lru_cache(maxsize=RESULT_TEXTS_CACHE_SIZE)
+def _classify_result_text(result):
+    text = result.strip()
+    lower = text.lower()
+    if not text or text == "Pending":
+        return RESULT_PENDING
+    if "no draw" in lower or "no_draw" in lower:
+        return RESULT_LOST
+    if lower in ("draw", "draw (x)"):
+        return RESULT_WON
+    return RESULT_LOST
+
+
+def encode_frame(df):
+    """Convert a processed frame to its compact storage dtypes (categoricals, datetime64)."""
+    if df.empty:
+        return df
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    df['Status'] = pd.Categorical(df['Status'], categories=STATUS_LABELS)
+    df['Parsed_Date'] = pd.to_datetime(df['Parsed_Date'])
+    return df
+
+
+def build_date_index(df):
+    """Build a secondary index over the Parsed_Date column.
+
+    Returns: dict with 'dates' (sorted datetime64 array) and 'positions'
+    (the matching row positions in df). Rows without a valid date are left out.
+    """
+    if df is None or df.empty or 'Parsed_Date' not in df:
+        return {"dates": np.array([], dtype='datetime64[ns]'), "positions": np.array([], dtype=np.int64)}
+
+    dates = df['Parsed_Date'].to_numpy(dtype='datetime64[ns]')
+    valid = np.flatnonzero(~np.isnat(dates))
+    order = valid[np.argsort(dates[valid], kind='stable')]
+    return {"dates": dates[order], "positions": order}
+
+
+def filter_date_range(df, date_index, start=None, end=None):
+    """Return the rows of df dated between start and end (inclusive), in their original order.
+
+    start/end may be date strings (any of DATE_FORMATS), dates or None for an open bound.
+    Uses binary search over the date index instead of scanning the frame.
+    """
+    if df is None or df.empty or (start is None and end is None):
+        return df
+
+    start = parse_date(start) if isinstance(start, str) else start
+    end = parse_date(end) if isinstance(end, str) else end
+    return df.iloc[_date_range_positions(date_index, start, end)]
+
+
+def _date_range_positions(date_index, start=None, end=None):
+    """Sorted positions of the indexed rows dated between start and end (dates or None), by binary search."""
+    dates = date_index["dates"]
+    lo, hi = 0, len(dates)
+    if start is not None:
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start).normalize()), side='left')
+    if end is not None:
+        end_of_day = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        hi = np.searchsorted(dates, np.datetime64(end_of_day), side='left')
+    return np.sort(date_index["positions"][lo:hi])
+
+
+def _parse_summary(comp):
+    """Read the frozen stats of an archived competition row (None if it was never archived)."""
+    if not str(comp.get('Matches', '')).strip():
+        return None
+    try:
+        return {
+            "total_staked": float(str(comp.get('Total_Staked', 0)).replace(',', '') or 0),
+            "total_income": float(str(comp.get('Total_Income', 0)).replace(',', '') or 0),
+            "net_profit": float(str(comp.get('Net_Profit', 0)).replace(',', '') or 0),
+            "open_loss": float(str(comp.get('Open_Loss', 0)).replace(',', '') or 0),
+            "matches": int(float(str(comp.get('Matches', 0)))),
+        }
+    except (ValueError, TypeError):
+        return None
+
 
 def build_competitions_dict(competitions_data):
     """Build a dictionary of competitions with their settings."""
@@ -36,12 +185,14 @@ def build_competitions_dict(competitions_data):
             'status': comp.get('Status', 'Active').strip(),
             'created_date': comp.get('Created_Date', ''),
             'closed_date': comp.get('Closed_Date', ''),
+            'summary': _parse_summary(comp),
             'row': competitions_data.index(comp) + 2  # +2 for header and 0-index
         }
 
     return comps
 
 
+@track_process_data
 def process_data(raw, competitions_dict):
     """Process raw match data and calculate betting cycles (martingale).
 
@@ -49,7 +200,7 @@ def process_data(raw, competitions_dict):
     """
     if not raw:
         empty_stats = {
-            name: {"total_staked": 0, "total_income": 0, "net_profit": 0}
+            name: {"total_staked": 0, "total_income": 0, "net_profit": 0, "open_loss": 0}
             for name in competitions_dict
         }
         next_bets = {
@@ -62,7 +213,7 @@ def process_data(raw, competitions_dict):
     cycle_investment = {name: 0.0 for name in competitions_dict}
     next_bets = {name: competitions_dict[name]['default_stake'] for name in competitions_dict}
     comp_stats = {
-        name: {"total_staked": 0.0, "total_income": 0.0, "net_profit": 0.0}
+        name: {"total_staked": 0.0, "total_income": 0.0, "net_profit": 0.0, "open_loss": 0.0}
         for name in competitions_dict
     }
 
@@ -74,7 +225,12 @@ def process_data(raw, competitions_dict):
         if comp not in competitions_dict:
             continue
 
+        # Soft-deleted (tombstoned) rows wait in the sheet for compaction
+        if str(row.get('Deleted', '')).strip():
+            continue
+
         comp_info = competitions_dict[comp]
+        match_id = str(row.get('ID', '')).strip()
         home = str(row.get('Home Team', '')).strip()
         away = str(row.get('Away Team', '')).strip()
         match_name = f"{home} vs {away}" if home and away else "Unknown Match"
@@ -95,17 +251,20 @@ def process_data(raw, competitions_dict):
         if stake == 0:
             stake = next_bets.get(comp, comp_info['default_stake'])
 
-        result = str(row.get('Result', '')).strip()
+        result_code = classify_result(str(row.get('Result', '')))
         date = str(row.get('Date', '')).strip()
+        parsed_date = parse_date(date)
 
-        if result == "Pending" or result == "" or not result:
+        if result_code == RESULT_PENDING:
             processed.append({
-                "Row": i + 2,
+                "ID": match_id,
+                "Row": row.get('_row', i + 2),
                 "Comp": comp,
                 "Match": match_name,
                 "Home": home,
                 "Away": away,
                 "Date": date,
+                "Parsed_Date": parsed_date,
                 "Profit": 0,
                 "Status": "Pending",
                 "Stake": stake,
@@ -118,12 +277,7 @@ def process_data(raw, competitions_dict):
         cycle_investment[comp] += stake
         comp_stats[comp]["total_staked"] += stake
 
-        result_lower = result.lower().strip()
-        is_win = (result == "Draw (X)" or result_lower == "draw" or result_lower == "draw (x)")
-        if "no draw" in result_lower or "no_draw" in result_lower:
-            is_win = False
-
-        if is_win:
+        if result_code == RESULT_WON:
             income = stake * odds
             net_profit = income - cycle_investment[comp]
             comp_stats[comp]["total_income"] += income
@@ -138,12 +292,14 @@ def process_data(raw, competitions_dict):
             status = "Lost"
 
         processed.append({
-            "Row": i + 2,
+            "ID": match_id,
+            "Row": row.get('_row', i + 2),
             "Comp": comp,
             "Match": match_name,
             "Home": home,
             "Away": away,
             "Date": date,
+            "Parsed_Date": parsed_date,
             "Profit": net_profit,
             "Status": status,
             "Stake": stake,
@@ -152,5 +308,411 @@ def process_data(raw, competitions_dict):
             "Expense": stake
         })
 
+    # Stakes lost in a cycle that hasn't been won back yet
+    for name, investment in cycle_investment.items():
+        comp_stats[name]["open_loss"] = investment
     pending_losses = sum(cycle_investment.values())
-    return pd.DataFrame(processed), next_bets, comp_stats, pending_losses
+    return encode_frame(pd.DataFrame(processed)), next_bets, comp_stats, pending_losses
+
+
+# --- SNAPSHOTS ---
+
+def _current_balance(bankroll, competition_stats):
+    """Bankroll plus realised profit, minus stakes lost in cycles that are still open."""
+    return bankroll + sum(s['net_profit'] - s['open_loss'] for s in competition_stats.values())
+
+
+def assemble_snapshot(matches_data, bankroll, competitions_data):
+    """Process raw sheet data into the snapshot dict the app serves."""
+    with phase("competitions"):
+        competitions_dict = build_competitions_dict(competitions_data)
+    # Archived competitions' matches live in the archive worksheet; only their frozen stats are used here
+    frozen = {k: v for k, v in competitions_dict.items() if v['status'] == 'Closed' and v['summary']}
+    hot = {k: v for k, v in competitions_dict.items() if k not in frozen}
+    with phase("process"):
+        df, next_bets, competition_stats, _ = process_data(matches_data, hot)
+    for name, comp in frozen.items():
+        competition_stats[name] = comp['summary']
+
+    return {
+        "error": None,
+        "bankroll": bankroll,
+        "current_bal": _current_balance(bankroll, competition_stats),
+        "active_competitions": {k: v for k, v in competitions_dict.items() if v['status'] == 'Active'},
+        "archived_competitions": {k: v for k, v in competitions_dict.items() if v['status'] == 'Closed'},
+        "matches_data": matches_data,
+        "df": df,
+        "date_index": build_date_index(df),
+        "match_index": {
+            row['ID']: row
+            for row in matches_data
+            if row.get('ID') and not str(row.get('Deleted', '')).strip()
+        },
+        "next_bets": next_bets,
+        "competition_stats": competition_stats,
+    }
+
+
+def same_sheet_data(a, b):
+    """Whether two snapshots were built from the same sheet contents."""
+    return (
+        a['bankroll'] == b['bankroll']
+        and a['matches_data'] == b['matches_data']
+        and a['active_competitions'] == b['active_competitions']
+        and a['archived_competitions'] == b['archived_competitions']
+    )
+
+
+def _replace_competition_rows(df, comp_df, name):
+    """Swap one competition's rows in a processed frame, keeping sheet order."""
+    parts = [comp_df]
+    if df is not None and not df.empty:
+        parts.insert(0, df[df['Comp'] != name])
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame()
+    merged = pd.concat(parts, ignore_index=True).sort_values('Row', kind='stable', ignore_index=True)
+    return encode_frame(merged)
+
+
+def recompute_competitions(snapshot, names):
+    """Return a copy of snapshot with the named competitions re-processed from its raw rows.
+
+    Betting cycles are independent per competition, so the others are left untouched.
+    """
+    comps = {**snapshot['active_competitions'], **snapshot['archived_competitions']}
+    df = snapshot['df']
+    next_bets = dict(snapshot['next_bets'])
+    competition_stats = dict(snapshot['competition_stats'])
+    for name in names:
+        if name not in comps or comps[name]['summary']:
+            continue
+        rows = [r for r in snapshot['matches_data'] if str(r.get('Competition', '')).strip() == name]
+        with phase("process"):
+            comp_df, comp_next, comp_stats, _ = process_data(rows, {name: comps[name]})
+        df = _replace_competition_rows(df, comp_df, name)
+        next_bets[name] = comp_next[name]
+        competition_stats[name] = comp_stats[name]
+
+    new = dict(snapshot)
+    new.update({
+        "df": df,
+        "date_index": build_date_index(df),
+        "next_bets": next_bets,
+        "competition_stats": competition_stats,
+        "current_bal": _current_balance(snapshot['bankroll'], competition_stats),
+    })
+    return new
+
+
+def patch_add_match(snapshot, record):
+    """Return a copy of snapshot with a newly appended match (a raw sheet record incl. ID and _row)."""
+    new = dict(snapshot)
+    new['matches_data'] = snapshot['matches_data'] + [record]
+    new['match_index'] = {**snapshot['match_index'], record['ID']: record}
+    return recompute_competitions(new, [str(record.get('Competition', '')).strip()])
+
+
+def patch_update_match(snapshot, match_id, changes):
+    """Return a copy of snapshot with one match's raw fields changed (a Deleted value soft-deletes it)."""
+    return patch_update_matches(snapshot, {match_id: changes})
+
+
+def patch_update_matches(snapshot, changes_by_id):
+    """Return a copy of snapshot with several matches' raw fields changed, keyed by match ID.
+
+    Each affected competition is re-processed once, however many of its matches changed.
+    """
+    index = dict(snapshot['match_index'])
+    replaced = {}
+    for match_id, changes in changes_by_id.items():
+        old = snapshot['match_index'][match_id]
+        record = dict(old, **changes)
+        replaced[id(old)] = record
+        if str(record.get('Deleted', '')).strip():
+            index.pop(match_id)
+        else:
+            index[match_id] = record
+
+    new = dict(snapshot)
+    new['matches_data'] = [replaced.get(id(r), r) for r in snapshot['matches_data']]
+    new['match_index'] = index
+    names = {str(r.get('Competition', '')).strip() for r in replaced.values()}
+    return recompute_competitions(new, sorted(names))
+
+
+def patch_bankroll(snapshot, bankroll):
+    """Return a copy of snapshot with a new bankroll."""
+    new = dict(snapshot)
+    new['bankroll'] = bankroll
+    new['current_bal'] = _current_balance(bankroll, snapshot['competition_stats'])
+    return new
+
+
+def patch_add_competition(snapshot, record, row):
+    """Return a copy of snapshot with a new competition (a raw Competitions sheet record) at sheet row `row`."""
+    comp = dict(next(iter(build_competitions_dict([record]).values())), row=row)
+    new = dict(snapshot)
+    new['active_competitions'] = {**snapshot['active_competitions'], comp['name']: comp}
+    return recompute_competitions(new, [comp['name']])
+
+
+def patch_competition_stake(snapshot, name, stake):
+    """Return a copy of snapshot with a competition's default stake changed."""
+    comp = dict(snapshot['active_competitions'][name], default_stake=float(stake))
+    new = dict(snapshot)
+    new['active_competitions'] = {**snapshot['active_competitions'], name: comp}
+    return recompute_competitions(new, [name])
+
+
+def patch_close_competition(snapshot, name, summary, closed_date, removed_rows):
+    """Return a copy of snapshot after a competition was closed and its rows archived.
+
+    summary: the frozen stats as written to the sheet (keyed by column header).
+    removed_rows: sorted sheet rows deleted from the matches sheet; the rows
+    below them are shifted up accordingly.
+    """
+    def shift(row):
+        return row - bisect.bisect_left(removed_rows, row)
+
+    matches_data = [
+        dict(r, _row=shift(r['_row']))
+        for r in snapshot['matches_data']
+        if str(r.get('Competition', '')).strip() != name
+    ]
+    comp = dict(
+        snapshot['active_competitions'][name],
+        status='Closed', closed_date=closed_date, summary=_parse_summary(summary),
+    )
+
+    df = _replace_competition_rows(snapshot['df'], pd.DataFrame(), name)
+    if not df.empty:
+        df['Row'] = df['Row'] - np.searchsorted(np.asarray(removed_rows), df['Row'].to_numpy(), side='left')
+
+    competition_stats = {**snapshot['competition_stats'], name: comp['summary']}
+    new = dict(snapshot)
+    new.update({
+        "active_competitions": {k: v for k, v in snapshot['active_competitions'].items() if k != name},
+        "archived_competitions": {**snapshot['archived_competitions'], name: comp},
+        "matches_data": matches_data,
+        "match_index": {
+            row['ID']: row
+            for row in matches_data
+            if row.get('ID') and not str(row.get('Deleted', '')).strip()
+        },
+        "df": df,
+        "date_index": build_date_index(df),
+        "next_bets": {k: v for k, v in snapshot['next_bets'].items() if k != name},
+        "competition_stats": competition_stats,
+        "current_bal": _current_balance(snapshot['bankroll'], competition_stats),
+    })
+    return new
+
+
+# --- MUTATION DELTAS ---
+
+# Processed fields shown on a match card
+MATCH_CARD_FIELDS = ("Date", "Home", "Away", "Match", "Odds", "Stake", "Status", "Profit")
+
+
+def changed_matches(before, after, competition):
+    """Diff one competition's processed matches between two snapshots.
+
+    A write can change more than its own row (an empty Stake follows the
+    betting cycle), so the whole competition is compared.
+    Returns: (records of `after` that are new or changed, in sheet order; IDs that are gone).
+    """
+    def by_id(snapshot):
+        df = snapshot['df']
+        if df is None or df.empty:
+            return {}
+        return {r['ID']: r for r in df[df['Comp'] == competition].to_dict('records')}
+
+    old, new = by_id(before), by_id(after)
+    changed = [
+        record for match_id, record in new.items()
+        if match_id not in old or any(old[match_id][f] != record[f] for f in MATCH_CARD_FIELDS)
+    ]
+    removed = [match_id for match_id in old if match_id not in new]
+    return changed, removed
+
+
+def snapshot_delta(before, after):
+    """Compact description of what changed between two snapshots (for live updates).
+
+    Returns: dict with the stats and next bet of each competition that changed,
+    the changed matches (JSON-ready) and removed match IDs, and whether the set
+    of active competitions changed.
+    """
+    competitions, matches, removed = {}, [], []
+    for name in after['active_competitions']:
+        changed, gone = changed_matches(before, after, name)
+        stats = after['competition_stats'].get(name)
+        next_bet = after['next_bets'].get(name)
+        if (changed or gone or stats != before['competition_stats'].get(name)
+                or next_bet != before['next_bets'].get(name)):
+            competitions[name] = {"stats": stats, "next_bet": next_bet}
+        matches += [
+            {
+                "id": r['ID'],
+                "competition": name,
+                "date": r['Date'],
+                "odds": float(r['Odds']),
+                "stake": float(r['Stake']),
+                "status": str(r['Status']),
+                "profit": float(r['Profit']),
+            }
+            for r in changed
+        ]
+        removed += gone
+
+    return {
+        "competitions": competitions,
+        "matches": matches,
+        "removed": removed,
+        "structure_changed": set(before['active_competitions']) != set(after['active_competitions']),
+    }
+
+
+# --- API VIEWS ---
+
+def _competition_json(comp, stats, next_bet):
+    return {
+        "name": comp['name'],
+        "description": comp['description'],
+        "status": comp['status'],
+        "row": comp['row'],
+        "default_stake": comp['default_stake'],
+        "created_date": comp['created_date'],
+        "closed_date": comp['closed_date'],
+        "colors": {"primary": comp['color1'], "secondary": comp['color2'], "text": comp['text_color']},
+        "logo": comp['logo'],
+        "stats": {key: value if isinstance(value, int) else float(value) for key, value in (stats or {}).items()},
+        "next_bet": next_bet,
+    }
+
+
+def _match_json(row):
+    return {
+        "id": row.ID,
+        "date": row.Date,
+        "parsed_date": row.Parsed_Date.date().isoformat() if not pd.isna(row.Parsed_Date) else None,
+        "competition": row.Comp,
+        "home": row.Home,
+        "away": row.Away,
+        "odds": float(row.Odds),
+        "stake": float(row.Stake),
+        "status": row.Status,
+        "income": float(row.Income),
+        "profit": float(row.Profit),
+    }
+
+
+def build_api_views(snapshot):
+    """Precompute the JSON-ready payloads of the read-only API for a snapshot.
+
+    Matches are ordered newest first (descending sheet row), with parallel numpy
+    arrays of their row, competition, status and date for filtering and cursor
+    pagination (see paginate_matches), and a date index over that order.
+    """
+    stats = snapshot['competition_stats']
+    competitions = [
+        _competition_json(comp, stats.get(name), snapshot['next_bets'].get(name))
+        for name, comp in {**snapshot['active_competitions'], **snapshot['archived_competitions']}.items()
+    ]
+
+    df = snapshot['df']
+    if df is None or df.empty:
+        ordered = pd.DataFrame(columns=['Row', 'Comp', 'Status', 'Parsed_Date'])
+        matches = []
+    else:
+        ordered = df.sort_values('Row', ascending=False, kind='stable')
+        matches = [_match_json(row) for row in ordered.itertuples(index=False)]
+
+    return {
+        "bankroll": snapshot['bankroll'],
+        "current_balance": snapshot['current_bal'],
+        "competitions": competitions,
+        "competitions_by_name": {comp['name']: comp for comp in competitions},
+        "matches": matches,
+        "rows": ordered['Row'].to_numpy(dtype=np.int64),
+        "comps": ordered['Comp'].astype(object).to_numpy(),
+        "statuses": ordered['Status'].astype(object).to_numpy(),
+        "dates": ordered['Parsed_Date'].to_numpy(dtype='datetime64[ns]'),
+        "date_index": build_date_index(ordered),
+    }
+
+
+def paginate_matches(views, competition=None, status=None, start=None, end=None, cursor=None, limit=50):
+    """Return one page of matches from build_api_views() output, newest first.
+
+    cursor is the sheet row of the last match of the previous page (the next
+    page starts below it), so pages stay stable while new matches are appended.
+    Returns: (matches list, next cursor or None on the last page).
+    """
+    rows = views['rows']
+    begin = 0 if cursor is None else int(np.searchsorted(-rows, -cursor, side='right'))
+    if start is None and end is None:
+        positions = np.arange(begin, len(rows))
+    else:
+        # Binary search the date index first, then filter only the matches in range
+        positions = _date_range_positions(views['date_index'], start, end)
+        positions = positions[np.searchsorted(positions, begin, side='left'):]
+    if competition is not None:
+        positions = positions[views['comps'][positions] == competition]
+    if status is not None:
+        positions = positions[views['statuses'][positions] == status]
+
+    positions = positions[:limit + 1]
+    page = [views['matches'][p] for p in positions[:limit]]
+    next_cursor = int(rows[positions[limit - 1]]) if len(positions) > limit else None
+    return page, next_cursor
+
+
+# --- LEDGER EXPORT ---
+
+# Processed ledger columns in export order; Cycle and Cycle_Stake are derived at export time
+EXPORT_COLUMNS = (
+    "ID", "Row", "Comp", "Date", "Parsed_Date", "Home", "Away", "Odds", "Stake",
+    "Status", "Income", "Expense", "Profit", "Cycle", "Cycle_Stake",
+)
+
+
+def ledger_cycles(df):
+    """Martingale cycle state of every match of a processed frame (in sheet order per competition).
+
+    Returns two arrays aligned with df: Cycle, the 1-based number of the
+    competition's cycle the match belongs to (a win closes a cycle), and
+    Cycle_Stake, the stakes invested in that cycle up to and including the match
+    (pending matches aren't invested yet).
+    """
+    ordered = df[['Row', 'Comp', 'Status', 'Stake']].reset_index(drop=True).sort_values('Row', kind='stable')
+    won = (ordered['Status'] == 'Won').astype(np.int64)
+    cycle = won.groupby(ordered['Comp'], observed=True).cumsum() - won + 1
+    invested = ordered['Stake'].where(ordered['Status'] != 'Pending', 0.0)
+    cycle_stake = invested.groupby([ordered['Comp'], cycle], observed=True).cumsum()
+    return cycle.sort_index().to_numpy(), cycle_stake.sort_index().to_numpy()
+
+
+def ledger_chunks(snapshot, competition=None, chunk_size=1000):
+    """Yield the processed ledger in sheet order as DataFrames of at most chunk_size rows.
+
+    Reads straight from the snapshot's frame: only the positions of the
+    selected matches and one chunk at a time are materialised.
+    """
+    df = snapshot['df']
+    if df is None or df.empty:
+        return
+    rows = df['Row'].to_numpy()
+    order = np.argsort(rows, kind='stable')
+    if competition is not None:
+        order = order[(df['Comp'] == competition).to_numpy()[order]]
+    cycle, cycle_stake = ledger_cycles(df)
+
+    columns = [c for c in EXPORT_COLUMNS if c in df.columns]
+    for start in range(0, len(order), chunk_size):
+        positions = order[start:start + chunk_size]
+        chunk = df.iloc[positions][columns].reset_index(drop=True)
+        chunk['Cycle'] = cycle[positions]
+        chunk['Cycle_Stake'] = cycle_stake[positions]
+        yield chunk
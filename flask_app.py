@@ -1,15 +1,39 @@
 """Elite Football Tracker — Flask Application."""
+import contextlib
 import datetime
+import hashlib
+import json
+import logging
 import os
+import queue
+import tempfile
+import threading
 import time
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+import uuid
+from flask import (
+    Flask, Response, render_template, request, jsonify, redirect, url_for, g, send_file,
+    before_render_template, template_rendered,
+)
+from markupsafe import Markup
 
 from sheets import (
     get_all_data, update_bankroll, add_match, update_match_result,
-    update_match, delete_match, add_competition, update_competition_stake,
-    close_competition, DEFAULT_BANKROLL
+    update_match, update_matches, delete_match, add_competition, update_competition_stake,
+    close_competition, tombstoned_rows, compact_matches, archive_matches, append_matches,
+    MatchMovedError, DEFAULT_BANKROLL
+)
+from data import (
+    process_data, filter_date_range, assemble_snapshot, patch_add_match, patch_update_match, patch_update_matches,
+    patch_bankroll, patch_add_competition, patch_competition_stake, patch_close_competition,
+    build_api_views, paginate_matches, parse_date, same_sheet_data, changed_matches, snapshot_delta,
+    ledger_chunks, STATUS_LABELS, MATCH_RESULTS
 )
-from data import build_competitions_dict, process_data
+import snapshot_store
+import fragment_cache
+import server_timing
+import metrics
+import profiler
+import match_import
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-prod")
@@ -26,63 +50,645 @@ def money_filter(value, decimals=0):
     except (ValueError, TypeError):
         return str(value)
 
+@app.context_processor
+def inject_generation():
+    """Expose the data generation a page was rendered from (live updates skip older events)."""
+    return {"generation": _cache["generation"]}
+
 APP_LOGO_URL = "https://i.postimg.cc/8Cr6SypK/yzwb-ll-sm.png"
 
+# --- PROFILER ---
+# With PROFILE_SECRET set, an admin can profile a single request end-to-end
+# (see profiler.py): ?profile=cprofile|sample&profile_secret=... or the
+# X-Profile / X-Profile-Secret headers. Registered first, so the profile covers
+# every other request hook.
+def _profile_secret():
+    return request.headers.get("X-Profile-Secret") or request.args.get("profile_secret")
+
+
+if profiler.ENABLED:
+    @app.before_request
+    def start_profile():
+        mode = request.headers.get("X-Profile") or request.args.get("profile")
+        if mode and profiler.authorized(_profile_secret()):
+            g.profile = profiler.start(mode)
+
+    @app.after_request
+    def save_profile(response):
+        handle = g.pop("profile", None)
+        if handle is not None:
+            response.headers["X-Profile-Name"] = profiler.stop(handle, f"{request.method}-{request.endpoint}")
+        return response
+
+
+@app.route("/admin/profiles")
+def admin_profiles():
+    """Recently saved request profiles (newest first)."""
+    if not profiler.authorized(_profile_secret()):
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    return jsonify({"ok": True, "profiles": profiler.list_profiles()})
+
+
+@app.route("/admin/profiles/<name>")
+def admin_profile(name):
+    """Download a saved profile (.prof pstats or .collapsed stacks)."""
+    path = profiler.profile_path(name) if profiler.authorized(_profile_secret()) else None
+    if path is None:
+        return jsonify({"ok": False, "error": "Not found"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=name)
+
+
+# --- SERVER TIMING ---
+# With SERVER_TIMING=1 each response carries a Server-Timing header with the
+# time spent per phase (see server_timing.py), and one JSON line per request is
+# logged. Registered right after the profiler, so the timing wraps every other
+# request hook.
+if server_timing.ENABLED:
+    app.logger.setLevel(min(app.logger.getEffectiveLevel(), logging.INFO))
+
+    @app.before_request
+    def start_server_timing():
+        server_timing.start()
+        g.render_depth = 0
+
+    @app.after_request
+    def add_server_timing(response):
+        phases, total = server_timing.finish()
+        if phases is None:
+            return response
+        response.headers["Server-Timing"] = server_timing.header(phases, total)
+        app.logger.info(json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in phases.items()},
+        }))
+        return response
+
+    @before_render_template.connect_via(app)
+    def _render_started(sender, **extra):
+        # Templates rendered inside a template (fragments) count as part of the outer one
+        if g.get("render_depth", 0) == 0:
+            g.render_started = time.perf_counter()
+        g.render_depth = g.get("render_depth", 0) + 1
+
+    @template_rendered.connect_via(app)
+    def _render_finished(sender, **extra):
+        g.render_depth -= 1
+        if g.render_depth == 0:
+            server_timing.add("render", time.perf_counter() - g.render_started)
+
+# --- METRICS ---
+# Prometheus metrics (see metrics.py): per-route latency here, cache, Sheets,
+# lock and process_data metrics where they happen.
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        endpoint = request.endpoint or "unknown"
+        metrics.REQUEST_SECONDS.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        metrics.REQUESTS.labels(endpoint, request.method, response.status_code).inc()
+    return response
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
 # --- CACHE ---
-_cache = {"data": None, "timestamp": 0}
-CACHE_TTL = 30  # seconds
+# The snapshot is shared by all workers through snapshot_store: every change (a
+# write in any worker, or a refresh that found new sheet data) bumps the shared
+# generation, and one worker (holding the refresh lease) rebuilds it for the
+# whole deployment while the others adopt the stored copy.
+# Stale-while-revalidate: a snapshot younger than CACHE_TTL is fresh. Up to
+# CACHE_MAX_STALENESS (the hard expiry) it is still served while a background
+# refresh runs. Past that, or after invalidate_cache(), the request loads
+# inline.
+_cache = {"data": None, "generation": -1, "last_result": None, "warm_start": False}
+CACHE_TTL = int(os.environ.get("CACHE_TTL", 30))  # seconds
+CACHE_MAX_STALENESS = int(os.environ.get("CACHE_MAX_STALENESS", 300))  # seconds, 0 disables stale serving
+REFRESH_LEASE = 30  # seconds one worker may spend refreshing on behalf of all of them
+_refresh_lock = threading.Lock()  # Held by this worker's one in-flight refresh (inline or background)
 
 def invalidate_cache():
-    """Call after any write operation to force fresh data on next load."""
-    _cache["timestamp"] = 0
+    """Call after any write operation to force fresh data on next load (in every worker)."""
+    snapshot_store.bump_generation()
 
 def load_app_data():
-    """Load and process all application data from Google Sheets (cached)."""
-    now = time.time()
-    if _cache["data"] is not None and (now - _cache["timestamp"]) < CACHE_TTL:
-        return _cache["data"]
+    """Load and process all application data from Google Sheets (cached, stale-while-revalidate).
 
-    matches_data, bankroll, competitions_data, error = get_all_data()
+    While the Sheets circuit breaker is open the last good snapshot is served,
+    flagged read_only, and recovery is probed in the background.
+    """
+    with server_timing.phase("cache"):
+        return _load_app_data()
 
-    if error:
-        return {
-            "error": error,
-            "bankroll": DEFAULT_BANKROLL,
-            "current_bal": DEFAULT_BANKROLL,
-            "active_competitions": {},
-            "archived_competitions": {},
-            "df": None,
-            "next_bets": {},
-            "competition_stats": {},
-            "logo": APP_LOGO_URL,
-        }
 
-    competitions_dict = build_competitions_dict(competitions_data)
-    df, next_bets, competition_stats, pending_losses = process_data(matches_data, competitions_dict)
+def _load_app_data():
+    if not breaker_closed() and _cache["data"] is not None:
+        metrics.CACHE_LOOKUPS.labels("degraded").inc()
+        if breaker_allows_request():
+            refresh_in_background()
+        return _degraded_snapshot()
 
-    active = {k: v for k, v in competitions_dict.items() if v['status'] == 'Active'}
-    archived = {k: v for k, v in competitions_dict.items() if v['status'] == 'Closed'}
+    state = snapshot_store.read_state()
+    current = state["snapshot_generation"] == state["generation"]
+    if current:
+        if _cache["generation"] != state["generation"] and not _adopt_stored_snapshot():
+            metrics.CACHE_LOOKUPS.labels("miss").inc()
+            return _refresh_single_flight()  # Stores a new, readable snapshot for everyone
+        age = time.time() - state["timestamp"]
+    else:
+        age = float("inf")  # Invalidated: there is no snapshot of the current data yet
 
-    # Calculate total profits across all competitions
-    total_profits = sum(s['net_profit'] for s in competition_stats.values())
-    current_bal = bankroll + total_profits - pending_losses
+    data = _cache["data"]
+    if data is not None and age < CACHE_TTL:
+        metrics.CACHE_LOOKUPS.labels("hit").inc()
+        return data
+    # The boot snapshot is served past its age only while nothing has invalidated it
+    if data is not None and (age < CACHE_MAX_STALENESS or (_cache["warm_start"] and current)):
+        metrics.CACHE_LOOKUPS.labels("stale").inc()
+        refresh_in_background()
+        return data
+    metrics.CACHE_LOOKUPS.labels("miss").inc()
+    return _refresh_single_flight()
 
-    result = {
-        "error": None,
-        "bankroll": bankroll,
-        "current_bal": current_bal,
-        "active_competitions": active,
-        "archived_competitions": archived,
-        "df": df,
-        "next_bets": next_bets,
-        "competition_stats": competition_stats,
+
+def warm_start():
+    """On boot, serve the persisted snapshot immediately and sync with Sheets in the background.
+
+    Until the first refresh succeeds the boot snapshot is served regardless of
+    its age. Skipped if a write invalidated it before the restart.
+    """
+    state = snapshot_store.read_state()
+    if state["snapshot_generation"] != state["generation"]:
+        return
+    if _adopt_stored_snapshot():
+        _cache["warm_start"] = True
+        refresh_in_background()
+
+
+def _adopt_stored_snapshot():
+    """Replace this worker's snapshot with the one stored by another worker.
+
+    Returns False if there is none or it can't be loaded (a corrupt file, or one
+    written by an incompatible pandas version).
+    """
+    try:
+        generation, data = snapshot_store.load_snapshot()
+    except Exception as e:
+        app.logger.warning("Could not load the stored snapshot: %s", e)
+        return False
+    if data is None:
+        return False
+    _cache["data"] = data
+    _cache["generation"] = generation
+    return True
+
+
+def _refresh_single_flight():
+    """Refresh inline with at most one load in flight per worker and per deployment.
+
+    Callers that arrive while another load in this worker is running wait for it
+    and share its result (errors included), unless an invalidate_cache() happened
+    after that load started. If another worker holds the refresh lease, wait for
+    the snapshot it stores instead of loading again.
+    """
+    generation = snapshot_store.read_state()["generation"]
+    seen = _cache["last_result"]
+    waited = time.perf_counter()
+    with _refresh_lock:
+        metrics.LOCK_WAIT_SECONDS.labels("refresh").observe(time.perf_counter() - waited)
+        last = _cache["last_result"]
+        if last is not seen and last[0] >= generation:
+            return last[1]
+
+        deadline = time.time() + REFRESH_LEASE
+        while not snapshot_store.acquire_lease(REFRESH_LEASE):
+            time.sleep(0.1)
+            state = snapshot_store.read_state()
+            if state["snapshot_generation"] == state["generation"] >= generation and _adopt_stored_snapshot():
+                return _cache["data"]
+            if time.time() > deadline:
+                return refresh_cache()
+
+        try:
+            return refresh_cache()
+        finally:
+            snapshot_store.release_lease()
+
+
+def refresh_cache(sheet_data=None, generation=None):
+    """Build a new snapshot, keep it in this worker and publish it to the shared store.
+
+    Changed data is published as a new generation; an unchanged sheet only renews
+    the stored snapshot's timestamp. A snapshot whose fetch started before an
+    invalidate_cache() is kept locally but not published, so it can't hide the write
+    that invalidated it. If Sheets fails (or the circuit breaker is open) the last
+    good snapshot is returned in read-only mode instead, when there is one.
+    sheet_data: get_all_data()'s result when it was already fetched (see asgi.py),
+    otherwise the sheet is read here; generation: the shared generation read before
+    that fetch started.
+    """
+    if generation is None:
+        generation = snapshot_store.read_state()["generation"]
+    if not breaker_allows_request():
+        result = _degraded_snapshot(_breaker["last_error"])
+        _cache["last_result"] = (generation, result)
+        return result
+
+    result = build_snapshot(sheet_data)
+    if result["error"]:
+        breaker_record_failure(result["error"])
+        if _cache["data"] is not None:
+            result = _degraded_snapshot(result["error"])
+        _cache["last_result"] = (generation, result)
+        return result
+
+    breaker_record_success()
+    _cache["warm_start"] = False
+    current = _cache["data"]
+    if current is not None and _cache["generation"] == generation and same_sheet_data(current, result):
+        # Nothing changed: keep the current version, so its generation (and ETags) stay valid
+        snapshot_store.touch_snapshot(generation)
+        result = current
+    else:
+        stored = snapshot_store.save_snapshot(result, generation)
+        _cache["data"] = result
+        _cache["generation"] = generation if stored is None else stored
+    _cache["last_result"] = (generation, result)
+    return result
+
+
+def refresh_in_background():
+    """Start a background refresh unless one is already in flight in this or another worker.
+
+    Runs in a thread, or on the event loop through async_refresher when served by asgi.py.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    if not snapshot_store.acquire_lease(REFRESH_LEASE):
+        _refresh_lock.release()
+        return
+
+    def done():
+        snapshot_store.release_lease()
+        _refresh_lock.release()
+
+    if async_refresher is not None:
+        async_refresher(done)
+        return
+
+    def run():
+        try:
+            refresh_cache()
+        except Exception as e:
+            app.logger.warning("Background refresh failed: %s", e)
+        finally:
+            done()
+
+    threading.Thread(target=run, name="cache-refresh", daemon=True).start()
+
+
+# Set by asgi.py: async_refresher(done) fetches the sheet without blocking a
+# thread, calls refresh_cache() with the result and then done()
+async_refresher = None
+
+
+def _degraded_snapshot(error=None):
+    """The last good snapshot, flagged read-only because Google Sheets is unavailable."""
+    if _cache["data"] is None:
+        return _error_snapshot(error or _breaker["last_error"])
+    return dict(_cache["data"], read_only=True, sheets_error=error or _breaker["last_error"])
+
+
+# --- CIRCUIT BREAKER ---
+# Trips after BREAKER_FAILURE_THRESHOLD consecutive Sheets failures (timeouts
+# included, see sheets.SHEETS_TIMEOUT). While open, no request waits on Sheets:
+# pages are served from the last good snapshot in read-only mode and writes are
+# rejected. After BREAKER_RESET_TIMEOUT one half-open probe is let through; its
+# outcome closes the breaker or re-opens it for another period.
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", 3))
+BREAKER_RESET_TIMEOUT = int(os.environ.get("BREAKER_RESET_TIMEOUT", 30))  # seconds
+BREAKER_CLOSED, BREAKER_OPEN, BREAKER_HALF_OPEN = "closed", "open", "half-open"
+_breaker = {"state": BREAKER_CLOSED, "failures": 0, "opened_at": 0, "last_error": None}
+_breaker_lock = threading.Lock()
+
+
+def breaker_closed():
+    return _breaker["state"] == BREAKER_CLOSED
+
+
+def breaker_allows_request():
+    """Whether a Sheets read may go ahead now. Moves an expired open breaker to half-open.
+
+    Half-open lets the probe through; the refresh lock and lease keep it to one
+    in flight.
+    """
+    with _breaker_lock:
+        if _breaker["state"] == BREAKER_OPEN and time.time() - _breaker["opened_at"] >= BREAKER_RESET_TIMEOUT:
+            _breaker["state"] = BREAKER_HALF_OPEN
+        return _breaker["state"] != BREAKER_OPEN
+
+
+def breaker_record_success():
+    with _breaker_lock:
+        if _breaker["state"] != BREAKER_CLOSED:
+            app.logger.info("Google Sheets recovered, leaving read-only mode")
+        _breaker.update(state=BREAKER_CLOSED, failures=0, last_error=None)
+
+
+def breaker_record_failure(error):
+    with _breaker_lock:
+        _breaker["failures"] += 1
+        _breaker["last_error"] = str(error)
+        if _breaker["state"] == BREAKER_HALF_OPEN or _breaker["failures"] >= BREAKER_FAILURE_THRESHOLD:
+            if _breaker["state"] == BREAKER_CLOSED:
+                app.logger.warning("Google Sheets unavailable, entering read-only mode: %s", error)
+            _breaker.update(state=BREAKER_OPEN, opened_at=time.time())
+
+
+@app.before_request
+def reject_writes_when_read_only():
+    """Writes can't reach Sheets while the breaker is open: reject them instead of queueing."""
+    if request.method == "POST" and not breaker_closed():
+        return jsonify({
+            "ok": False,
+            "read_only": True,
+            "error": "Google Sheets is unavailable, the tracker is read-only until it recovers",
+        }), 503
+
+
+def _error_snapshot(error):
+    """The empty snapshot shown when Sheets fails and there is no good snapshot to fall back on."""
+    return {
+        "error": error,
+        "bankroll": DEFAULT_BANKROLL,
+        "current_bal": DEFAULT_BANKROLL,
+        "active_competitions": {},
+        "archived_competitions": {},
+        "matches_data": [],
+        "df": None,
+        "date_index": None,
+        "match_index": {},
+        "next_bets": {},
+        "competition_stats": {},
         "logo": APP_LOGO_URL,
     }
-    _cache["data"] = result
-    _cache["timestamp"] = time.time()
+
+
+def build_snapshot(sheet_data=None):
+    """Load and process all application data from Google Sheets (uncached).
+
+    sheet_data: an already fetched get_all_data() result to process instead.
+    """
+    if sheet_data is None:
+        with server_timing.phase("sheets"):
+            sheet_data = get_all_data()
+    matches_data, bankroll, competitions_data, error = sheet_data
+
+    if error:
+        return _error_snapshot(error)
+
+    result = assemble_snapshot(matches_data, bankroll, competitions_data)
+    result["logo"] = APP_LOGO_URL
+    result["version"] = new_version()
     return result
 
 
+def new_version():
+    """A unique data version for a new snapshot (it keys the rendered-fragment cache)."""
+    return uuid.uuid4().hex[:16]
+
+
+# --- WRITE-THROUGH ---
+# Writes patch the cached snapshot with their delta (re-processing only the
+# affected competition) and publish it to every worker, instead of forcing a
+# full re-download. A full refetch only happens on schedule or on conflict.
+_write_lock = threading.Lock()
+
+
+def write_through(write, patch):
+    """Run a Sheets write and apply its delta to the cached snapshot.
+
+    write(snapshot) performs the Sheets call and returns its result. Callers read
+    and check the request data first: anything write() raises counts as a Sheets
+    failure. patch(snapshot, result) returns the patched copy of the snapshot, or None if
+    the delta can't be applied. If patching fails, the Sheets call fails, or another
+    worker changed the data in the meantime, the cache is invalidated instead.
+    Returns write()'s result.
+    """
+    waited = time.perf_counter()
+    with _write_lock:
+        metrics.LOCK_WAIT_SECONDS.labels("write").observe(time.perf_counter() - waited)
+        snapshot = load_app_data()
+        if snapshot.get("read_only"):
+            raise RuntimeError("Google Sheets is unavailable, the tracker is read-only until it recovers")
+        generation = _cache["generation"]
+        try:
+            with server_timing.phase("sheets_write"):
+                result = write(snapshot)
+        except MatchMovedError:
+            invalidate_cache()  # Rows were removed since this snapshot was built
+            raise
+        except Exception as e:
+            # Callers read the request data before, so this failed talking to Sheets,
+            # possibly after the write was applied
+            breaker_record_failure(e)
+            invalidate_cache()
+            raise
+
+        try:
+            with server_timing.phase("patch"):
+                new = None if snapshot["error"] else patch(snapshot, result)
+        except Exception as e:
+            app.logger.warning("Write-through patch failed, invalidating cache: %s", e)
+            new = None
+
+        if new is not None:
+            new["version"] = new_version()
+        if new is not None and snapshot_store.publish_snapshot(new, generation):
+            _cache["data"] = new
+            _cache["generation"] = generation + 1
+        else:
+            invalidate_cache()
+        return result
+
+
+# --- MATCH ID INDEX ---
+
+def resolve_match_row(match_id):
+    """Return the current sheet row of a match by its stable ID (None if unknown)."""
+    record = load_app_data()["match_index"].get(match_id)
+    return record["_row"] if record else None
+
+
+# --- COMPACTION ---
+COMPACTION_INTERVAL = int(os.environ.get("COMPACTION_INTERVAL", 3600))  # seconds between runs
+COMPACTION_QUIET_PERIOD = int(os.environ.get("COMPACTION_QUIET_PERIOD", 300))  # seconds since last write
+ROW_REMOVAL_LOCK_FILE = os.path.join(os.path.dirname(snapshot_store.SNAPSHOT_DB), "row-removal.lock")
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process local runs only
+    fcntl = None
+
+
+@contextlib.contextmanager
+def row_removal_lock(blocking=True, shared=False):
+    """Deployment-wide lock on the matches sheet's row numbers.
+
+    Removing rows (compaction, archiving) holds it exclusively; match writes hold
+    it shared from their row check until the write is done, so no row moves in
+    between. Yields whether it was acquired: False only when not blocking and it
+    is held. Take it before _write_lock, never while holding it.
+    """
+    with open(ROW_REMOVAL_LOCK_FILE, "a") as lock:
+        if fcntl is not None:
+            mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(lock, mode | (0 if blocking else fcntl.LOCK_NB))
+            except OSError:
+                yield False
+                return
+        yield True
+
+
+def run_compaction():
+    """Remove tombstoned match rows unless another worker is already removing rows.
+
+    Only if there are tombstones, the rows are removed under the write lock after
+    invalidating the snapshot, so no write uses row numbers that are about to
+    change. Rebuilds the snapshot (and with it the ID-to-row index) once
+    afterwards. Returns the number of rows removed.
+    """
+    with row_removal_lock(blocking=False) as acquired:
+        if not acquired:
+            return 0
+        rows = tombstoned_rows()
+        if not rows:
+            return 0
+        with _write_lock:
+            invalidate_cache()
+            compact_matches(rows)
+            invalidate_cache()  # Another worker may have reloaded the old rows meanwhile
+
+    load_app_data()
+    return len(rows)
+
+
+def _compaction_loop():
+    last_run = time.time()
+    while True:
+        time.sleep(min(COMPACTION_INTERVAL, COMPACTION_QUIET_PERIOD, 60))
+        now = time.time()
+        last_write = snapshot_store.read_state()["last_write"]
+        if now - last_run < COMPACTION_INTERVAL or now - last_write < COMPACTION_QUIET_PERIOD:
+            continue
+        last_run = now
+        try:
+            run_compaction()
+        except Exception as e:
+            app.logger.warning("Compaction failed: %s", e)
+
+
+def start_compaction_scheduler():
+    """Start the background compaction thread (disabled with COMPACTION_INTERVAL=0)."""
+    if COMPACTION_INTERVAL > 0:
+        threading.Thread(target=_compaction_loop, name="compaction", daemon=True).start()
+
+
+# --- FRAGMENT CACHE ---
+FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", 256))  # rendered fragments kept per worker
+
+
+@app.template_global()
+def fragment(template, version, *key, **context):
+    """Render a partial template, cached per data version and key (uncached without a version).
+
+    Usage: {{ fragment("partials/x.html", version, comp_name, comp_name=comp_name, ...) }}
+    The key must identify everything in the context that isn't determined by the version.
+    """
+    if not version:
+        return Markup(render_template(template, **context))
+    return fragment_cache.get_or_render(
+        (template, version) + key, lambda: render_template(template, **context), FRAGMENT_CACHE_SIZE
+    )
+
+
+@app.route("/api/fragment-cache")
+def api_fragment_cache():
+    """Fragment cache hit-rate metrics for this worker."""
+    return jsonify(dict(fragment_cache.stats(), ok=True, capacity=FRAGMENT_CACHE_SIZE, pid=os.getpid()))
+
+
+# --- CONDITIONAL GET ---
+# Pages and API responses carry an ETag derived from the snapshot generation,
+# the read-only flag and the request path + query, so a browser revalidating an
+# unchanged page gets a 304 without anything being rendered.
+CONDITIONAL_ENDPOINTS = {
+    "overview", "competition", "competition_matches", "new_competition", "archive", "manage",
+    "api_competitions", "api_competition", "api_matches", "api_export",
+}
+
+
+def _release_id():
+    """Identify the deployed templates and static files (a deploy must invalidate cached pages)."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    mtimes = [
+        os.path.getmtime(os.path.join(dirpath, name))
+        for folder in ("templates", "static")
+        for dirpath, _, names in os.walk(os.path.join(root, folder))
+        for name in names
+    ]
+    return str(max(mtimes, default=0))
+
+
+RELEASE_ID = os.environ.get("RELEASE_ID") or _release_id()
+
+
+def current_etag():
+    """ETag for the current request against the current snapshot (None if there is no data)."""
+    data = load_app_data()
+    if data["error"]:
+        return None
+    key = f"{RELEASE_ID}:{_cache['generation']}:{bool(data.get('read_only'))}:{request.full_path}"
+    return hashlib.sha1(key.encode()).hexdigest()[:24]
+
+
+@app.before_request
+def answer_not_modified():
+    if request.method != "GET" or request.endpoint not in CONDITIONAL_ENDPOINTS:
+        return None
+    g.etag = current_etag()
+    if g.etag and request.if_none_match.contains(g.etag):
+        response = app.response_class(status=304)
+        response.set_etag(g.etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return None
+
+
+@app.after_request
+def add_cache_headers(response):
+    """Attach the ETag to fresh responses; browsers must revalidate before reusing them."""
+    etag = g.pop("etag", None)
+    if etag and response.status_code == 200:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 # --- PAGE ROUTES ---
 
 @app.route("/")
@@ -93,17 +699,41 @@ def overview():
 
     # Calculate per-competition profits for overview cards
     comp_profits = {}
-    if data["df"] is not None and not data["df"].empty:
-        for comp_name in data["active_competitions"]:
-            comp_df = data["df"][data["df"]["Comp"] == comp_name]
-            comp_profits[comp_name] = comp_df["Profit"].sum() if not comp_df.empty else 0
-    else:
-        for comp_name in data["active_competitions"]:
-            comp_profits[comp_name] = 0
+    with server_timing.phase("filter"):
+        if data["df"] is not None and not data["df"].empty:
+            for comp_name in data["active_competitions"]:
+                comp_df = data["df"][data["df"]["Comp"] == comp_name]
+                comp_profits[comp_name] = comp_df["Profit"].sum() if not comp_df.empty else 0
+        else:
+            for comp_name in data["active_competitions"]:
+                comp_profits[comp_name] = 0
 
     return render_template("overview.html", comp_profits=comp_profits, **data)
 
 
+MATCH_PAGE_SIZE = int(os.environ.get("MATCH_PAGE_SIZE", 20))  # matches per page of a competition's history
+
+
+def competition_matches_page(data, name, date_from=None, date_to=None, cursor=None):
+    """One page of a competition's matches, newest first.
+
+    cursor is the sheet row of the last match already shown (see paginate_matches).
+    Returns: (list of match records, next cursor or None on the last page,
+    number of matches on all pages).
+    """
+    if data["df"] is None or data["df"].empty:
+        return [], None, 0
+    with server_timing.phase("filter"):
+        df = filter_date_range(data["df"], data["date_index"], date_from, date_to)
+        comp_df = df[df["Comp"] == name]
+        total = len(comp_df)
+        if cursor is not None:
+            comp_df = comp_df[comp_df["Row"] < cursor]
+        page = comp_df.nlargest(MATCH_PAGE_SIZE + 1, "Row").to_dict("records")
+    next_cursor = int(page[MATCH_PAGE_SIZE - 1]["Row"]) if len(page) > MATCH_PAGE_SIZE else None
+    return page[:MATCH_PAGE_SIZE], next_cursor, total
+
+
 @app.route("/competition/<name>")
 def competition(name):
     data = load_app_data()
@@ -114,10 +744,9 @@ def competition(name):
     stats = data["competition_stats"].get(name, {"total_staked": 0, "total_income": 0, "net_profit": 0})
     next_bet = data["next_bets"].get(name, comp_info["default_stake"])
 
-    matches = []
-    if data["df"] is not None and not data["df"].empty:
-        comp_df = data["df"][data["df"]["Comp"] == name]
-        matches = comp_df.sort_index(ascending=False).to_dict("records")
+    date_from = request.args.get("from") or None
+    date_to = request.args.get("to") or None
+    matches, next_cursor, match_count = competition_matches_page(data, name, date_from, date_to)
 
     return render_template(
         "competition.html",
@@ -126,10 +755,57 @@ def competition(name):
         stats=stats,
         next_bet=next_bet,
         matches=matches,
+        match_count=match_count,
+        next_cursor=next_cursor,
+        more_url=url_for("competition_matches", name=name, **{"from": date_from, "to": date_to}),
+        date_from=date_from or "",
+        date_to=date_to or "",
         **data,
     )
 
 
+@app.route("/competition/<name>/matches")
+def competition_matches(name):
+    """The next page of a competition's match history as HTML cards (infinite scroll).
+
+    The cursor of the page after it is returned in the X-Next-Cursor header.
+    """
+    data = load_app_data()
+    if name not in data["active_competitions"]:
+        return "", 404
+    try:
+        cursor = int(request.args["cursor"]) if request.args.get("cursor") else None
+    except ValueError:
+        return "", 400
+    date_from = request.args.get("from") or None
+    date_to = request.args.get("to") or None
+    matches, next_cursor, _ = competition_matches_page(data, name, date_from, date_to, cursor)
+
+    html = fragment(
+        "partials/match_cards.html", data.get("version"), name, date_from, date_to, cursor, matches=matches,
+    )
+    response = app.response_class(html, mimetype="text/html")
+    response.headers["X-Next-Cursor"] = "" if next_cursor is None else str(next_cursor)
+    return response
+
+
+@app.route("/competition/<name>/cards")
+def competition_cards(name):
+    """Re-rendered cards of the given matches (?ids=a,b) plus the competition summary (for live updates)."""
+    data = load_app_data()
+    if name not in data["active_competitions"]:
+        return jsonify({"ok": False, "error": "Competition not found"}), 404
+    ids = {i for i in request.args.get("ids", "").split(",") if i}
+    df = data["df"]
+    matches = []
+    if ids and df is not None and not df.empty:
+        matches = df[(df["Comp"] == name) & df["ID"].isin(ids)].to_dict("records")
+    return jsonify(dict(
+        competition_payload(data, name, matches),
+        ok=True, generation=_cache["generation"], balance=balance_payload(data),
+    ))
+
+
 @app.route("/new-competition")
 def new_competition():
     data = load_app_data()
@@ -139,16 +815,16 @@ def new_competition():
 @app.route("/archive")
 def archive():
     data = load_app_data()
-    archive_profits = {}
-    if data["df"] is not None and not data["df"].empty:
-        for comp_name in data["archived_competitions"]:
-            comp_df = data["df"][data["df"]["Comp"] == comp_name]
-            archive_profits[comp_name] = comp_df["Profit"].sum() if not comp_df.empty else 0
-    else:
-        for comp_name in data["archived_competitions"]:
-            archive_profits[comp_name] = 0
+    archived = data["archived_competitions"]
+    # The snapshot holds the frozen summary of every archived competition, so the
+    # archive worksheet itself is never read on a request
+    archive_stats = {name: data["competition_stats"].get(name) for name in archived}
+
+    default_stats = {"total_staked": 0, "total_income": 0, "net_profit": 0}
+    archive_stats = {name: stats or default_stats for name, stats in archive_stats.items()}
+    archive_profits = {name: stats["net_profit"] for name, stats in archive_stats.items()}
 
-    return render_template("archive.html", archive_profits=archive_profits, **data)
+    return render_template("archive.html", archive_profits=archive_profits, archive_stats=archive_stats, **data)
 
 
 @app.route("/manage")
@@ -159,71 +835,314 @@ def manage():
 
 # --- API ENDPOINTS ---
 
+def match_competition(snapshot, match_id):
+    """Competition name of a match (by its stable ID) in a snapshot."""
+    return str(snapshot["match_index"][match_id].get("Competition", "")).strip()
+
+
+def balance_payload(data):
+    """Bankroll and balance, raw and formatted, for in-place page updates."""
+    bankroll, current_bal = data["bankroll"], data["current_bal"]
+    return {
+        "bankroll": bankroll,
+        "current_bal": current_bal,
+        "bankroll_display": money_filter(bankroll),
+        "display": money_filter(current_bal, 2),
+        "change_pct": (current_bal - bankroll) / bankroll * 100 if bankroll > 0 else 0,
+    }
+
+
+def competition_payload(data, competition, matches, removed=()):
+    """A competition's stats, next bet, summary block and re-rendered cards of `matches`."""
+    comp_info = data["active_competitions"][competition]
+    stats = data["competition_stats"].get(competition, {"total_staked": 0, "total_income": 0, "net_profit": 0})
+    next_bet = data["next_bets"].get(competition, comp_info["default_stake"])
+    return {
+        "competition": {"name": competition, "stats": stats, "next_bet": next_bet},
+        "matches": [
+            {"id": match["ID"], "html": render_template("partials/match_cards.html", matches=[match])}
+            for match in matches
+        ],
+        "removed": list(removed),
+        "summary_html": render_template(
+            "partials/competition_summary.html", comp_name=competition,
+            current_bal=data["current_bal"], bankroll=data["bankroll"], stats=stats, next_bet=next_bet,
+        ),
+    }
+
+
+def mutation_response(before, *competitions, **extra):
+    """JSON answer to a successful write, so the page can update in place instead of reloading.
+
+    Carries the balance and, for match writes, the re-rendered cards of each
+    competition's matches that changed (or were removed) since `before`, its
+    stats summary and next bet. A single competition's payload is merged into
+    the top level; several are listed under "competitions".
+    """
+    data = load_app_data()
+    body = dict(extra, ok=True, generation=_cache["generation"], balance=balance_payload(data))
+    payloads = []
+    for competition in competitions:
+        if competition in data["active_competitions"]:
+            changed, removed = changed_matches(before, data, competition)
+            payloads.append(competition_payload(data, competition, changed, removed))
+    if len(payloads) == 1:
+        body.update(payloads[0])
+    elif payloads:
+        body["competitions"] = payloads
+    return jsonify(body)
+
+
 @app.route("/api/match", methods=["POST"])
 def api_add_match():
     """Add a new match."""
     d = request.json
     try:
-        add_match(
-            d.get("date", str(datetime.date.today())),
-            d["competition"],
-            d["home"],
-            d["away"],
-            d["odds"],
-            d.get("result", "Pending"),
-            d["stake"],
+        before = load_app_data()
+        record = {
+            "Date": d.get("date", str(datetime.date.today())),
+            "Competition": d["competition"],
+            "Home Team": d["home"],
+            "Away Team": d["away"],
+            "Odds": d["odds"],
+            "Result": d.get("result", "Pending"),
+            "Stake": d["stake"],
+            "Profit": 0,
+        }
+        if record["Result"] not in MATCH_RESULTS:
+            return jsonify({"ok": False, "error": f"result must be one of {', '.join(MATCH_RESULTS)}"}), 400
+
+        def patch(snapshot, added):
+            match_id, row = added
+            return patch_add_match(snapshot, dict(record, ID=match_id, _row=row)) if row else None
+
+        match_id, _ = write_through(
+            lambda snapshot: add_match(
+                record["Date"], record["Competition"], record["Home Team"], record["Away Team"],
+                record["Odds"], record["Result"], record["Stake"],
+            ),
+            patch,
         )
-        invalidate_cache()
-        return jsonify({"ok": True})
+        return mutation_response(before, record["Competition"], id=match_id)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
-@app.route("/api/match/<int:row>/result", methods=["POST"])
-def api_update_result(row):
+@app.route("/api/match/<match_id>/result", methods=["POST"])
+def api_update_result(match_id):
     """Update match result (win/loss)."""
     d = request.json
+    before = load_app_data()
+    row = resolve_match_row(match_id)
+    if row is None:
+        return jsonify({"ok": False, "error": "Match not found"}), 404
     try:
-        update_match_result(row, d["result"])
-        invalidate_cache()
-        return jsonify({"ok": True})
+        result = d["result"]
+        if result not in MATCH_RESULTS:
+            return jsonify({"ok": False, "error": f"result must be one of {', '.join(MATCH_RESULTS)}"}), 400
+        with row_removal_lock(shared=True):
+            write_through(
+                lambda snapshot: update_match_result(row, match_id, result),
+                lambda snapshot, _: patch_update_match(snapshot, match_id, {"Result": result}),
+            )
+        return mutation_response(before, match_competition(before, match_id))
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
-@app.route("/api/match/<int:row>/edit", methods=["POST"])
-def api_edit_match(row):
+@app.route("/api/match/<match_id>/edit", methods=["POST"])
+def api_edit_match(match_id):
     """Edit match data."""
     d = request.json
+    before = load_app_data()
+    row = resolve_match_row(match_id)
+    if row is None:
+        return jsonify({"ok": False, "error": "Match not found"}), 404
     try:
-        update_match(row, d["date"], d["home"], d["away"], d["odds"], d["result"], d["stake"])
-        invalidate_cache()
-        return jsonify({"ok": True})
+        changes = {
+            "Date": d["date"],
+            "Home Team": d["home"],
+            "Away Team": d["away"],
+            "Odds": d["odds"],
+            "Result": d["result"],
+            "Stake": d["stake"],
+        }
+        if changes["Result"] not in MATCH_RESULTS:
+            return jsonify({"ok": False, "error": f"result must be one of {', '.join(MATCH_RESULTS)}"}), 400
+        with row_removal_lock(shared=True):
+            write_through(
+                lambda snapshot: update_match(
+                    row, match_id, changes["Date"], changes["Home Team"], changes["Away Team"],
+                    changes["Odds"], changes["Result"], changes["Stake"],
+                ),
+                lambda snapshot, _: patch_update_match(snapshot, match_id, changes),
+            )
+        return mutation_response(before, match_competition(before, match_id))
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
-@app.route("/api/match/<int:row>/delete", methods=["POST"])
-def api_delete_match(row):
+@app.route("/api/match/<match_id>/delete", methods=["POST"])
+def api_delete_match(match_id):
     """Delete a match."""
+    before = load_app_data()
+    row = resolve_match_row(match_id)
+    if row is None:
+        return jsonify({"ok": False, "error": "Match not found"}), 404
     try:
-        delete_match(row)
-        invalidate_cache()
-        return jsonify({"ok": True})
+        with row_removal_lock(shared=True):
+            write_through(
+                lambda snapshot: delete_match(row, match_id),
+                lambda snapshot, tombstone: patch_update_match(snapshot, match_id, {"Deleted": tombstone}),
+            )
+        return mutation_response(before, match_competition(before, match_id))
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+
+BATCH_MAX_SIZE = 100
+BATCH_EDIT_FIELDS = ("date", "home", "away", "odds", "result", "stake")
+
+
+def validate_batch(snapshot, mutations):
+    """Check a batch of match mutations as a whole. Returns a list of {"index", "error"} (empty if valid)."""
+    errors, seen = [], set()
+    for i, m in enumerate(mutations):
+        if not isinstance(m, dict) or m.get("op") not in ("result", "edit", "delete"):
+            error = "op must be one of result, edit, delete"
+        elif not isinstance(m.get("id"), str) or m["id"] not in snapshot["match_index"]:
+            error = "Match not found"
+        elif m["id"] in seen:
+            error = "Match appears more than once"
+        elif m["op"] == "edit" and any(m.get(f) in (None, "") for f in BATCH_EDIT_FIELDS):
+            error = f"edit needs {', '.join(BATCH_EDIT_FIELDS)}"
+        elif m["op"] in ("result", "edit") and m.get("result") not in MATCH_RESULTS:
+            error = f"result must be one of {', '.join(MATCH_RESULTS)}"
+        else:
+            error = None
+            if m["op"] == "edit":
+                try:
+                    if float(m["odds"]) <= 0 or float(m["stake"]) <= 0:
+                        error = "odds and stake must be positive"
+                except (TypeError, ValueError):
+                    error = "odds and stake must be numbers"
+        if error:
+            errors.append({"index": i, "error": error})
+        else:
+            seen.add(m["id"])
+    return errors
+
+
+def _batch_changes(m, tombstone):
+    """Raw sheet fields changed by one batch mutation."""
+    if m["op"] == "result":
+        return {"Result": m["result"]}
+    if m["op"] == "delete":
+        return {"Deleted": tombstone}
+    return {
+        "Date": m["date"], "Home Team": m["home"], "Away Team": m["away"],
+        "Odds": m["odds"], "Result": m["result"], "Stake": m["stake"],
+    }
+
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """Apply several match mutations at once: one Sheets batch update, one recompute per competition.
+
+    Body: {"mutations": [{"op": "result", "id", "result"}, {"op": "edit", "id", "date",
+    "home", "away", "odds", "result", "stake"}, {"op": "delete", "id"}, ...]}.
+    Nothing is written unless every mutation is valid.
+    """
+    mutations = (request.json or {}).get("mutations")
+    if not isinstance(mutations, list) or not mutations:
+        return jsonify({"ok": False, "error": "mutations must be a non-empty list"}), 400
+    if len(mutations) > BATCH_MAX_SIZE:
+        return jsonify({"ok": False, "error": f"At most {BATCH_MAX_SIZE} mutations per batch"}), 400
+
+    before = load_app_data()
+    errors = validate_batch(before, mutations)
+    if errors:
+        return jsonify({"ok": False, "error": "Invalid batch, nothing was changed", "errors": errors}), 400
+
+    try:
+        def write(snapshot):
+            # Rows are resolved under the write lock, from the snapshot the patch will apply to
+            return update_matches([dict(m, row=snapshot["match_index"][m["id"]]["_row"]) for m in mutations])
+
+        with row_removal_lock(shared=True):
+            write_through(
+                write,
+                lambda snapshot, tombstone: patch_update_matches(
+                    snapshot, {m["id"]: _batch_changes(m, tombstone) for m in mutations}
+                ),
+            )
+        competitions = sorted({match_competition(before, m["id"]) for m in mutations})
+        return mutation_response(before, *competitions, updated=len(mutations))
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+@app.route("/api/import", methods=["POST"])
+def api_import():
+    """Bulk-import matches from an uploaded CSV or XLSX file (multipart field "file").
+
+    The file is parsed as a stream and appended in chunks; invalid rows are skipped
+    and reported. The snapshot is re-processed once at the end instead of per row.
+    Set the form field dry_run=1 to only validate.
+    """
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"ok": False, "error": "No file uploaded"}), 400
+    dry_run = request.form.get("dry_run") in ("1", "true")
+
+    def progress(summary):
+        app.logger.info("Import %s: %d rows imported, %d skipped", upload.filename, summary["imported"], summary["skipped"])
+
+    try:
+        # Checks the file type and header before anything is written
+        records = match_import.read_matches(upload.stream, upload.filename)
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    try:
+        def run(snapshot):
+            return match_import.import_matches(
+                records, set(snapshot["active_competitions"]), append_matches,
+                dry_run=dry_run, progress=progress,
+            )
+
+        if dry_run:
+            summary = run(load_app_data())
+        else:
+            # No patch: the whole snapshot is rebuilt once, after the last chunk
+            summary = write_through(run, lambda snapshot, summary: None)
+            load_app_data()
+        return jsonify(dict(summary, ok=True, dry_run=dry_run))
+    except match_import.ImportStopped as e:
+        # Some rows may be in the sheet: report how many, so a retry can skip them
+        return jsonify(dict(e.summary, ok=False, dry_run=dry_run, error=str(e))), 500
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+
+def _bankroll_write(delta):
+    def write(snapshot):
+        new_amount = snapshot["bankroll"] + delta
+        update_bankroll(new_amount)
+        return new_amount
+    return write
+
+
 @app.route("/api/bankroll/deposit", methods=["POST"])
 def api_deposit():
     """Deposit to bankroll."""
     d = request.json
     try:
-        data = load_app_data()
-        new_amount = data["bankroll"] + float(d["amount"])
-        update_bankroll(new_amount)
-        invalidate_cache()
-        return jsonify({"ok": True, "new_bankroll": new_amount})
+        before = load_app_data()
+        new_amount = write_through(_bankroll_write(float(d["amount"])), patch_bankroll)
+        return mutation_response(before, new_bankroll=new_amount)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
@@ -233,11 +1152,9 @@ def api_withdraw():
     """Withdraw from bankroll."""
     d = request.json
     try:
-        data = load_app_data()
-        new_amount = data["bankroll"] - float(d["amount"])
-        update_bankroll(new_amount)
-        invalidate_cache()
-        return jsonify({"ok": True, "new_bankroll": new_amount})
+        before = load_app_data()
+        new_amount = write_through(_bankroll_write(-float(d["amount"])), patch_bankroll)
+        return mutation_response(before, new_bankroll=new_amount)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
@@ -247,28 +1164,50 @@ def api_create_competition():
     """Create a new competition."""
     d = request.json
     try:
-        add_competition(
-            d["name"],
-            d.get("description", ""),
-            d.get("default_stake", 30.0),
-            d.get("color1", "#4CABFF"),
-            d.get("color2", "#E6F7FF"),
-            d.get("text_color", "#004085"),
-            d.get("logo_url", ""),
+        record = {
+            "Name": d["name"],
+            "Description": d.get("description", ""),
+            "Default_Stake": d.get("default_stake", 30.0),
+            "Color1": d.get("color1", "#4CABFF"),
+            "Color2": d.get("color2", "#E6F7FF"),
+            "Text_Color": d.get("text_color", "#004085"),
+            "Logo_URL": d.get("logo_url", ""),
+            "Status": "Active",
+        }
+
+        def patch(snapshot, added):
+            created_date, row = added
+            return patch_add_competition(snapshot, dict(record, Created_Date=created_date), row) if row else None
+
+        write_through(
+            lambda snapshot: add_competition(
+                record["Name"], record["Description"], record["Default_Stake"],
+                record["Color1"], record["Color2"], record["Text_Color"], record["Logo_URL"],
+            ),
+            patch,
         )
-        invalidate_cache()
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+def _active_competition_at(snapshot, row):
+    """Name of the active competition on a Competitions sheet row (None if there is none)."""
+    return next((n for n, c in snapshot["active_competitions"].items() if c["row"] == row), None)
+
+
 @app.route("/api/competition/<int:row>/stake", methods=["POST"])
 def api_update_stake(row):
     """Update competition default stake."""
     d = request.json
     try:
-        update_competition_stake(row, d["stake"])
-        invalidate_cache()
+        stake = d["stake"]
+
+        def patch(snapshot, _):
+            name = _active_competition_at(snapshot, row)
+            return patch_competition_stake(snapshot, name, stake) if name else None
+
+        write_through(lambda snapshot: update_competition_stake(row, stake), patch)
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -276,14 +1215,302 @@ def api_update_stake(row):
 
 @app.route("/api/competition/<int:row>/close", methods=["POST"])
 def api_close_competition(row):
-    """Close a competition."""
+    """Close a competition and move its matches to the archive worksheet."""
     try:
-        close_competition(row)
+        # The frozen stats must come from the sheet itself, not from a patched snapshot
         invalidate_cache()
+        name = _active_competition_at(load_app_data(), row)
+        if name is None:
+            return jsonify({"ok": False, "error": "Competition not found"}), 404
+
+        def write(snapshot):
+            stats = snapshot["competition_stats"][name]
+            df = snapshot["df"]
+            summary = {
+                "Total_Staked": stats["total_staked"],
+                "Total_Income": stats["total_income"],
+                "Net_Profit": stats["net_profit"],
+                "Open_Loss": stats["open_loss"],
+                "Matches": int((df["Comp"] == name).sum()) if df is not None and not df.empty else 0,
+            }
+            # Close first: if archiving then fails, the frozen summary is already
+            # recorded and the matches just stay in the matches sheet
+            closed_date = close_competition(row, summary)
+            removed_rows = archive_matches(name)
+            return summary, closed_date, removed_rows
+
+        with row_removal_lock():
+            write_through(write, lambda snapshot, closed: patch_close_competition(snapshot, name, *closed))
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+# --- LIVE UPDATES (Server-Sent Events) ---
+# One watcher thread per worker polls the shared generation (a single-row read,
+# whatever the number of clients) and fans each change out, as a compact delta,
+# to the queues of the worker's connected browsers. Streams are capped per
+# worker and closed after SSE_MAX_DURATION; EventSource reconnects by itself.
+SSE_POLL_INTERVAL = float(os.environ.get("SSE_POLL_INTERVAL", 1))  # seconds
+SSE_HEARTBEAT = 15  # seconds between keep-alive comments
+SSE_MAX_CLIENTS = int(os.environ.get("SSE_MAX_CLIENTS", 24))  # per worker, keep below gunicorn threads
+SSE_MAX_DURATION = int(os.environ.get("SSE_MAX_DURATION", 600))  # seconds
+SSE_QUEUE_SIZE = 32  # undelivered events before a slow client is told to resync
+_subscribers = {}  # token -> {"queue", "dropped"}
+_subscribers_lock = threading.Lock()
+_watcher = {"thread": None}
+
+
+def _sse_message(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, default=str)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def _broadcast(message):
+    with _subscribers_lock:
+        subscribers = list(_subscribers.values())
+    for subscriber in subscribers:
+        try:
+            subscriber["queue"].put_nowait(message)
+        except queue.Full:
+            subscriber["dropped"] = True
+
+
+def _watch_generation():
+    """Broadcast a delta whenever a new snapshot generation is stored (runs while anyone listens)."""
+    previous, generation = None, None
+    while True:
+        time.sleep(SSE_POLL_INTERVAL)
+        with _subscribers_lock:
+            if not _subscribers:
+                _watcher["thread"] = None
+                return
+        try:
+            state = snapshot_store.read_state()
+            if state["snapshot_generation"] != state["generation"] or state["generation"] == generation:
+                continue
+            data = load_app_data()
+            if data["error"] or data.get("read_only"):
+                continue
+            if previous is not None and _cache["generation"] != generation:
+                delta = snapshot_delta(previous, data)
+                delta.update(generation=_cache["generation"], balance=balance_payload(data))
+                _broadcast(_sse_message("update", delta, _cache["generation"]))
+            previous, generation = data, _cache["generation"]
+        except Exception as e:
+            app.logger.warning("Live update failed: %s", e)
+
+
+@app.route("/api/events")
+def api_events():
+    """Stream snapshot changes to the browser (text/event-stream).
+
+    A client reconnecting with an older Last-Event-ID (or one that fell too far
+    behind) gets a resync event, telling it to reload instead of patching.
+    """
+    token = object()
+    subscriber = {"queue": queue.Queue(maxsize=SSE_QUEUE_SIZE), "dropped": False}
+    with _subscribers_lock:
+        if len(_subscribers) >= SSE_MAX_CLIENTS:
+            return jsonify({"ok": False, "error": "Too many live connections"}), 503, {"Retry-After": "30"}
+        _subscribers[token] = subscriber
+        if _watcher["thread"] is None:
+            _watcher["thread"] = threading.Thread(target=_watch_generation, name="sse-watcher", daemon=True)
+            _watcher["thread"].start()
+
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    generation = snapshot_store.read_state()["generation"]
+
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            if last_event_id.isdigit() and int(last_event_id) < generation:
+                yield _sse_message("resync", {"generation": generation})
+            deadline = time.time() + SSE_MAX_DURATION
+            while time.time() < deadline:
+                try:
+                    message = subscriber["queue"].get(timeout=SSE_HEARTBEAT)
+                except queue.Empty:
+                    message = ": keep-alive\n\n"
+                if subscriber["dropped"]:
+                    yield _sse_message("resync", {"generation": snapshot_store.read_state()["generation"]})
+                    return
+                yield message
+        finally:
+            with _subscribers_lock:
+                _subscribers.pop(token, None)
+
+    return app.response_class(
+        stream(), mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# --- READ-ONLY JSON API ---
+# Payloads are precomputed once per snapshot (build_api_views), so polling
+# clients only cost a dict lookup or a filtered slice of the match index.
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+_api_views = {"source": None, "views": None}
+
+
+def load_api_views():
+    """Return (snapshot, API views of it); the views are rebuilt only when the snapshot changes."""
+    data = load_app_data()
+    source = _cache["data"] if _cache["data"] is not None else data  # read-only copies share the views
+    if _api_views["source"] is not source:
+        with server_timing.phase("api_views"):
+            _api_views["views"] = build_api_views(source)
+        _api_views["source"] = source
+    return data, _api_views["views"]
+
+
+@app.route("/api/competitions")
+def api_competitions():
+    """All competitions (active and archived) with their stats and next bet."""
+    data, views = load_api_views()
+    if data["error"]:
+        return jsonify({"ok": False, "error": data["error"]}), 503
+    return jsonify({
+        "ok": True,
+        "read_only": bool(data.get("read_only")),
+        "bankroll": views["bankroll"],
+        "current_balance": views["current_balance"],
+        "competitions": views["competitions"],
+    })
+
+
+@app.route("/api/competitions/<name>")
+def api_competition(name):
+    """One competition with its stats and next bet."""
+    data, views = load_api_views()
+    if data["error"]:
+        return jsonify({"ok": False, "error": data["error"]}), 503
+    comp = views["competitions_by_name"].get(name)
+    if comp is None:
+        return jsonify({"ok": False, "error": "Competition not found"}), 404
+    return jsonify({"ok": True, "read_only": bool(data.get("read_only")), "competition": comp})
+
+
+@app.route("/api/matches")
+def api_matches():
+    """Matches newest first, filterable by competition, status and date range.
+
+    Query: competition, status (Pending/Won/Lost), from, to, limit, cursor (the
+    next_cursor of the previous page).
+    """
+    data, views = load_api_views()
+    if data["error"]:
+        return jsonify({"ok": False, "error": data["error"]}), 503
+
+    args = request.args
+    try:
+        limit = min(max(int(args.get("limit", API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+        cursor = int(args["cursor"]) if args.get("cursor") else None
+    except ValueError:
+        return jsonify({"ok": False, "error": "limit and cursor must be integers"}), 400
+    status = args.get("status") or None
+    if status is not None and status not in STATUS_LABELS:
+        return jsonify({"ok": False, "error": f"status must be one of {', '.join(STATUS_LABELS)}"}), 400
+    dates = {}
+    for key in ("from", "to"):
+        dates[key] = parse_date(args[key]) if args.get(key) else None
+        if args.get(key) and dates[key] is None:
+            return jsonify({"ok": False, "error": f"Invalid date: {args[key]}"}), 400
+
+    with server_timing.phase("filter"):
+        matches, next_cursor = paginate_matches(
+            views, competition=args.get("competition") or None, status=status,
+            start=dates["from"], end=dates["to"], cursor=cursor, limit=limit,
+        )
+    return jsonify({
+        "ok": True,
+        "read_only": bool(data.get("read_only")),
+        "matches": matches,
+        "next_cursor": next_cursor,
+    })
+
+
+# --- LEDGER EXPORT ---
+# The processed ledger (profit, income and martingale cycle state per match),
+# read chunk by chunk from the cached snapshot. CSV and JSON Lines are streamed
+# as they are produced; Parquet (needs pyarrow) is written one row group per
+# chunk to a spooled temp file and sent when complete.
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 1000))  # matches per chunk / Parquet row group
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _export_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header, date_format="%Y-%m-%d")
+        header = False
+
+
+def _export_ndjson(chunks):
+    for chunk in chunks:
+        yield chunk.to_json(orient="records", lines=True, date_format="iso")
+
+
+def _export_parquet(chunks):
+    """Write the chunks to a Parquet file (one row group each). Returns the rewound file object."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(out, table.schema)
+        writer.write_table(table.cast(writer.schema))
+    if writer is not None:
+        writer.close()
+    out.seek(0)
+    return out
+
+
+@app.route("/api/export/matches.<fmt>")
+def api_export(fmt):
+    """Export the processed ledger as CSV, JSON Lines or Parquet.
+
+    Query: competition (default: all competitions).
+    """
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"ok": False, "error": f"Unknown format, use one of {', '.join(EXPORT_FORMATS)}"}), 404
+    data = load_app_data()
+    if data["error"]:
+        return jsonify({"ok": False, "error": data["error"]}), 503
+    competition = request.args.get("competition")
+    if competition is not None and competition not in data["competition_stats"]:
+        return jsonify({"ok": False, "error": "Competition not found"}), 404
+
+    chunks = ledger_chunks(data, competition, EXPORT_CHUNK_SIZE)
+    filename = f"{competition or 'matches'}.{fmt}"
+    if fmt == "parquet":
+        try:
+            out = _export_parquet(chunks)
+        except ImportError:
+            return jsonify({"ok": False, "error": "Parquet export needs pyarrow (pip install pyarrow)"}), 501
+        return send_file(out, mimetype=EXPORT_FORMATS[fmt], as_attachment=True, download_name=filename)
+
+    stream = _export_csv(chunks) if fmt == "csv" else _export_ndjson(chunks)
+    return Response(
+        stream,
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+metrics.register_snapshot_collector(snapshot_store.read_state, lambda: _cache["data"])
+if os.environ.get("WARM_START", "1") == "1":
+    warm_start()
+start_compaction_scheduler()
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
@@ -0,0 +1,54 @@
+"""Rendered-fragment cache for Elite Football Tracker.
+
+Heavy template blocks (competition cards, match lists, recent activity) are
+rendered once per data version and kept in a small in-process LRU. A new
+snapshot has a new version, so stale fragments are never served; they just age
+out of the LRU.
+"""
+import threading
+from collections import OrderedDict
+
+from markupsafe import Markup
+
+_fragments = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def get_or_render(key, render, capacity):
+    """Return the cached HTML for key, or call render() and cache its result.
+
+    Keeps at most `capacity` fragments, evicting the least recently used.
+    """
+    with _lock:
+        html = _fragments.get(key)
+        if html is not None:
+            _fragments.move_to_end(key)
+            _stats["hits"] += 1
+            return html
+        _stats["misses"] += 1
+
+    html = Markup(render())
+    with _lock:
+        _fragments[key] = html
+        _fragments.move_to_end(key)
+        while len(_fragments) > capacity:
+            _fragments.popitem(last=False)
+            _stats["evictions"] += 1
+    return html
+
+
+def stats():
+    """Hit/miss/eviction counters, the hit rate and the current number of fragments."""
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return dict(
+            _stats,
+            size=len(_fragments),
+            hit_rate=_stats["hits"] / lookups if lookups else 0.0,
+        )
+
+
+def clear():
+    with _lock:
+        _fragments.clear()
@@ -0,0 +1,29 @@
+"""Gunicorn settings for Elite Football Tracker (loaded automatically from the working directory)."""
+import os
+import shutil
+import tempfile
+
+# Threaded workers: a live-updates (SSE) stream holds one thread, not a whole worker process.
+# Keep SSE_MAX_CLIENTS below `threads` so streams can't starve page requests.
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+timeout = 120
+
+# Prometheus metrics of all workers are aggregated through files in this directory (see metrics.py).
+# Set here, in the master, so every worker inherits it before importing prometheus_client.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "elite-football-tracker-metrics")
+)
+
+
+def on_starting(server):
+    """Start every deployment with empty metric files."""
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,242 @@
+"""Bulk match import for Elite Football Tracker.
+
+Reads a CSV or XLSX file row by row (the file is never loaded whole), checks
+every row against the active competitions and appends the valid ones to the
+matches sheet in chunks of IMPORT_CHUNK_SIZE rows per request. Invalid rows are
+skipped and reported with their line number.
+
+Used by POST /api/import and from the command line:
+
+    python match_import.py matches.csv [--dry-run] [--chunk-size 500]
+"""
+import argparse
+import csv
+import datetime
+import io
+import os
+import sys
+
+from data import build_competitions_dict, parse_date
+
+IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", 500))  # rows per append request
+IMPORT_MAX_ERRORS = 100  # invalid rows reported in detail, the rest are only counted
+IMPORT_RESULTS = ("Pending", "Draw (X)", "No Draw")
+
+# Accepted header spellings (lower-cased) -> field
+COLUMN_ALIASES = {
+    "date": "date",
+    "competition": "competition",
+    "comp": "competition",
+    "home team": "home",
+    "home": "home",
+    "away team": "away",
+    "away": "away",
+    "odds": "odds",
+    "result": "result",
+    "stake": "stake",
+}
+REQUIRED_FIELDS = ("date", "competition", "home", "away", "odds", "stake")
+
+
+class ImportStopped(RuntimeError):
+    """An import failed partway, after rows may have been appended. summary: the import summary so far."""
+
+    def __init__(self, summary, error):
+        super().__init__(f"Import stopped after {summary['imported']} rows: {error}")
+        self.summary = summary
+
+
+def _cell(value):
+    """A spreadsheet cell as text (XLSX dates as ISO dates, whole numbers without .0)."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _fields(header):
+    """The field of each header column (None for unknown ones). Raises ValueError if a required one is missing."""
+    fields = [COLUMN_ALIASES.get(_cell(h).lower()) for h in header]
+    missing = [f for f in REQUIRED_FIELDS if f not in fields]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return fields
+
+
+def _records(fields, rows, first_line):
+    """Map data rows onto fields. Yields (line number, record)."""
+    for line, row in enumerate(rows, start=first_line):
+        values = [_cell(v) for v in row]
+        if any(values):
+            yield line, {f: v for f, v in zip(fields, values) if f}
+
+
+def read_csv(stream):
+    """Stream records from a binary CSV file object. The header is read and checked right away."""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = next(reader, None)
+    if header is None:
+        return iter(())
+    return _records(_fields(header), reader, 2)
+
+
+def read_xlsx(stream):
+    """Stream records from the first worksheet of a binary XLSX file object. The header is read and checked right away."""
+    try:
+        import openpyxl
+    except ImportError:
+        raise RuntimeError("XLSX import needs openpyxl (pip install openpyxl)")
+
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        fields = None if header is None else _fields(header)
+    except Exception:
+        workbook.close()
+        raise
+    return _xlsx_records(workbook, fields, rows)
+
+
+def _xlsx_records(workbook, fields, rows):
+    try:
+        if fields is not None:
+            yield from _records(fields, rows, 2)
+    finally:
+        workbook.close()
+
+
+def read_matches(stream, filename):
+    """Stream (line number, record) pairs from a CSV or XLSX file, chosen by extension.
+
+    Raises ValueError straight away for an unsupported file, an undecodable or
+    incomplete header; errors in later rows surface while iterating.
+    """
+    if filename.lower().endswith(".xlsx"):
+        return read_xlsx(stream)
+    if filename.lower().endswith(".csv"):
+        return read_csv(stream)
+    raise ValueError("Only .csv and .xlsx files can be imported")
+
+
+def validate_match(record, competitions):
+    """Check one record. Returns (match tuple for sheets.append_matches, None) or (None, error)."""
+    missing = [f for f in REQUIRED_FIELDS if not record.get(f)]
+    if missing:
+        return None, f"Missing {', '.join(missing)}"
+    if record["competition"] not in competitions:
+        return None, f"Unknown or closed competition: {record['competition']}"
+    if parse_date(record["date"]) is None:
+        return None, f"Unrecognised date: {record['date']}"
+    result = record.get("result") or "Pending"
+    if result not in IMPORT_RESULTS:
+        return None, f"result must be one of {', '.join(IMPORT_RESULTS)}"
+    try:
+        # Same parsing as process_data: a comma is a decimal separator
+        odds = float(record["odds"].replace(",", "."))
+        stake = float(record["stake"].replace(",", ".").replace("₪", "").strip())
+    except ValueError:
+        return None, "odds and stake must be numbers"
+    if odds <= 0 or stake <= 0:
+        return None, "odds and stake must be positive"
+    return (record["date"], record["competition"], record["home"], record["away"], odds, result, stake), None
+
+
+def active_competitions(competitions_data):
+    """Names of the active competitions in Competitions sheet rows."""
+    return {
+        name for name, comp in build_competitions_dict(competitions_data).items()
+        if comp["status"] == "Active"
+    }
+
+
+def import_matches(records, competitions, append, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False, progress=None):
+    """Validate records and append the valid ones in chunks.
+
+    records: (line number, record) pairs from read_matches(). competitions: names
+    of the active competitions. append(matches) writes one chunk (see
+    sheets.append_matches). progress(summary) is called after every chunk.
+    Returns a summary: imported, skipped, chunks and errors ({"line", "error"}).
+    In a dry run nothing is appended and imported counts the rows that would be.
+    Raises ImportStopped if appending fails, or if reading fails once rows were appended.
+    """
+    summary = {"imported": 0, "skipped": 0, "chunks": 0, "errors": []}
+    chunk = []
+
+    def flush():
+        if chunk and not dry_run:
+            try:
+                append(chunk)
+            except Exception as e:
+                raise ImportStopped(summary, e) from e
+            summary["chunks"] += 1
+        summary["imported"] += len(chunk)
+        chunk.clear()
+        if progress:
+            progress(summary)
+
+    try:
+        for line, record in records:
+            match, error = validate_match(record, competitions)
+            if error:
+                summary["skipped"] += 1
+                if len(summary["errors"]) < IMPORT_MAX_ERRORS:
+                    summary["errors"].append({"line": line, "error": error})
+                continue
+            chunk.append(match)
+            if len(chunk) >= chunk_size:
+                flush()
+    except ImportStopped:
+        raise
+    except Exception as e:
+        # A bad row further down the file (e.g. invalid UTF-8): report what was already appended
+        if summary["chunks"]:
+            raise ImportStopped(summary, e) from e
+        raise
+    flush()
+    return summary
+
+
+def main(argv=None):
+    """Command-line import: python match_import.py FILE [--dry-run] [--chunk-size N]."""
+    import sheets
+    import snapshot_store
+
+    parser = argparse.ArgumentParser(description="Import matches from a CSV or XLSX file into the tracker sheet.")
+    parser.add_argument("file", help="CSV or XLSX file with Date, Competition, Home Team, Away Team, Odds, Result, Stake columns")
+    parser.add_argument("--dry-run", action="store_true", help="validate the file without writing anything")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="rows per append request")
+    args = parser.parse_args(argv)
+
+    competitions = active_competitions(sheets.get_competitions())
+    stopped = None
+    with open(args.file, "rb") as f:
+        try:
+            summary = import_matches(
+                read_matches(f, args.file), competitions, sheets.append_matches,
+                chunk_size=args.chunk_size, dry_run=args.dry_run,
+                progress=lambda s: print(f"{s['imported']} rows {'checked' if args.dry_run else 'imported'}, {s['skipped']} skipped"),
+            )
+        except ImportStopped as e:
+            summary, stopped = e.summary, e
+
+    for error in summary["errors"]:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    if summary["imported"] and not args.dry_run:
+        # Only reaches app workers on this host (sharing SNAPSHOT_DB): they re-process the
+        # sheet on their next request. Elsewhere the import shows after the next refresh.
+        snapshot_store.bump_generation()
+    if stopped:
+        print(stopped, file=sys.stderr)
+        return 1
+    print(f"Done: {summary['imported']} imported, {summary['skipped']} skipped")
+    return 1 if summary["skipped"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
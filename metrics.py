@@ -0,0 +1,121 @@
+"""Prometheus metrics for Elite Football Tracker.
+
+Served at /metrics. Under gunicorn every worker writes its samples to files in
+PROMETHEUS_MULTIPROC_DIR (set up by gunicorn.conf.py) and a scrape aggregates
+all of them; without that variable the metrics of the current process are
+served. Snapshot age, generation and size are read at scrape time.
+"""
+import functools
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+SHEETS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30)
+FAST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+CACHE_LOOKUPS = Counter(
+    "tracker_cache_lookups_total", "Snapshot lookups by outcome (hit, stale, miss, degraded)", ["result"],
+)
+SHEETS_CALLS = Counter(
+    "tracker_sheets_calls_total", "Google Sheets calls by operation and outcome", ["operation", "status"],
+)
+SHEETS_SECONDS = Histogram(
+    "tracker_sheets_call_seconds", "Google Sheets call latency by operation", ["operation"], buckets=SHEETS_BUCKETS,
+)
+LOCK_WAIT_SECONDS = Histogram(
+    "tracker_lock_wait_seconds", "Time spent waiting for the refresh lease or the write lock", ["lock"],
+    buckets=FAST_BUCKETS + (10, 30),
+)
+PROCESS_SECONDS = Histogram("tracker_process_data_seconds", "process_data() duration", buckets=FAST_BUCKETS)
+PROCESS_ROWS = Counter("tracker_process_data_rows_total", "Raw match rows run through process_data()")
+REQUEST_SECONDS = Histogram(
+    "tracker_request_seconds", "Request latency by route", ["endpoint", "method"], buckets=FAST_BUCKETS + (10,),
+)
+REQUESTS = Counter("tracker_requests_total", "Requests by route and status", ["endpoint", "method", "status"])
+
+
+def observe_sheets_call(operation, seconds, ok):
+    SHEETS_SECONDS.labels(operation).observe(seconds)
+    SHEETS_CALLS.labels(operation, "ok" if ok else "error").inc()
+
+
+def sheets_call(operation, failed=None):
+    """Decorator counting and timing a Google Sheets operation.
+
+    A call fails if it raises, or if failed(result) is true (for functions that
+    report errors in their return value).
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = not (failed and failed(result))
+                return result
+            finally:
+                observe_sheets_call(operation, time.perf_counter() - start, ok)
+        return wrapper
+    return decorate
+
+
+def track_process_data(func):
+    """Decorator timing process_data(raw, competitions_dict) and counting its input rows."""
+    @functools.wraps(func)
+    def wrapper(raw, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(raw, *args, **kwargs)
+        finally:
+            PROCESS_SECONDS.observe(time.perf_counter() - start)
+            PROCESS_ROWS.inc(len(raw) if raw else 0)
+    return wrapper
+
+
+class SnapshotCollector:
+    """Scrape-time gauges of the shared snapshot: read_state() returns the store's
+    counters, snapshot() this worker's current snapshot (or None)."""
+
+    def __init__(self, read_state, snapshot):
+        self.read_state = read_state
+        self.snapshot = snapshot
+
+    def collect(self):
+        state = self.read_state()
+        age = GaugeMetricFamily("tracker_snapshot_age_seconds", "Seconds since the shared snapshot was refreshed")
+        age.add_metric([], time.time() - state["timestamp"] if state["timestamp"] else float("nan"))
+        generation = GaugeMetricFamily("tracker_snapshot_generation", "Current shared data generation")
+        generation.add_metric([], state["generation"])
+        matches = GaugeMetricFamily("tracker_snapshot_matches", "Processed matches in the current snapshot")
+        data = self.snapshot()
+        df = data["df"] if data else None
+        matches.add_metric([], 0 if df is None else len(df))
+        return [age, generation, matches]
+
+
+_snapshot_collector = {"collector": None}
+
+
+def register_snapshot_collector(read_state, snapshot):
+    """Report the snapshot gauges (see SnapshotCollector) on every scrape."""
+    collector = SnapshotCollector(read_state, snapshot)
+    _snapshot_collector["collector"] = collector
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        REGISTRY.register(collector)
+
+
+def render():
+    """The metrics exposition: (body, content type)."""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    if _snapshot_collector["collector"] is not None:
+        registry.register(_snapshot_collector["collector"])
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,132 @@
+"""On-demand request profiler for Elite Football Tracker.
+
+Only active when PROFILE_SECRET is set. A request carrying the secret (header
+X-Profile-Secret or query parameter profile_secret) and asking for a profile
+(header X-Profile or query parameter profile: "cprofile" or "sample") is
+profiled from its first to its last request hook:
+
+- cprofile: deterministic cProfile of the request thread, saved as a .prof
+  pstats file (open with snakeviz, or python -m pstats).
+- sample: a thread samples the request thread's stack every
+  PROFILE_SAMPLE_INTERVAL seconds, saved as .collapsed stacks (one
+  "frame;frame;frame count" line per stack) for flamegraph.pl or speedscope.
+
+Files go to PROFILE_DIR; the newest PROFILE_KEEP are kept. One request per
+process is profiled at a time.
+"""
+import cProfile
+import collections
+import hmac
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+PROFILE_SECRET = os.environ.get("PROFILE_SECRET", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "elite-football-tracker-profiles"))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 20))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", 0.001))  # seconds
+MODES = {"cprofile": ".prof", "sample": ".collapsed"}
+
+ENABLED = bool(PROFILE_SECRET)
+
+_busy = threading.Lock()
+
+
+def authorized(secret):
+    return ENABLED and bool(secret) and hmac.compare_digest(secret.encode(), PROFILE_SECRET.encode())
+
+
+class _Sampler:
+    """Samples one thread's stack on a background thread and counts the collapsed stacks."""
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.stacks = collections.Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def enable(self):
+        self.thread.start()
+
+    def disable(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stopped.wait(PROFILE_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def start(mode):
+    """Start profiling the current thread. Returns a handle for stop(), or None if another profile is running."""
+    if mode not in MODES or not _busy.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile() if mode == "cprofile" else _Sampler(threading.get_ident())
+    profiler.enable()
+    return {"mode": mode, "profiler": profiler, "started": time.perf_counter()}
+
+
+def stop(handle, label):
+    """Stop a profile and save it. Returns the file name."""
+    try:
+        handle["profiler"].disable()
+        elapsed_ms = (time.perf_counter() - handle["started"]) * 1000
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", label)[:60]
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{slug}-{elapsed_ms:.0f}ms{MODES[handle['mode']]}"
+        path = os.path.join(PROFILE_DIR, name)
+        if handle["mode"] == "cprofile":
+            handle["profiler"].dump_stats(path)
+        else:
+            handle["profiler"].dump(path)
+        _prune()
+        return name
+    finally:
+        _busy.release()
+
+
+def _prune():
+    for name in list_profiles()[PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name["name"]))
+        except OSError:
+            pass
+
+
+def list_profiles():
+    """Saved profiles, newest first: dicts with name, size and created (epoch seconds)."""
+    try:
+        names = [n for n in os.listdir(PROFILE_DIR) if n.endswith(tuple(MODES.values()))]
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            stat = os.stat(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            continue
+        profiles.append({"name": name, "size": stat.st_size, "created": stat.st_mtime})
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+
+def profile_path(name):
+    """Path of a saved profile, or None if there is no such file."""
+    if name != os.path.basename(name) or not name.endswith(tuple(MODES.values())):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
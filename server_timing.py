@@ -0,0 +1,73 @@
+"""Per-request phase timings for Elite Football Tracker.
+
+With SERVER_TIMING=1 every request collects how long it spent in each phase
+(cache lookup, Sheets download, competitions, process_data, filtering,
+template rendering, ...) and reports it as a Server-Timing response header and
+one JSON log line. Phases are collected per thread, so work done by background
+refreshes isn't charged to the request that happened to trigger them.
+
+Disabled (the default), phase() returns a shared no-op context manager and no
+request hooks are installed.
+"""
+import contextlib
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("SERVER_TIMING", "0") == "1"
+
+_local = threading.local()
+_NOOP = contextlib.nullcontext()
+
+
+class _Phase:
+    __slots__ = ("phases", "name", "start")
+
+    def __init__(self, phases, name):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        add(self.name, time.perf_counter() - self.start, self.phases)
+
+
+def start():
+    """Begin collecting phases for the current request (on this thread)."""
+    _local.phases = {}
+    _local.started = time.perf_counter()
+
+
+def finish():
+    """Stop collecting. Returns (phases dict of name -> seconds, total seconds), or (None, None)."""
+    phases = getattr(_local, "phases", None)
+    _local.phases = None
+    if phases is None:
+        return None, None
+    return phases, time.perf_counter() - _local.started
+
+
+def phase(name):
+    """Context manager timing a phase of the current request (repeated phases add up)."""
+    phases = getattr(_local, "phases", None)
+    if phases is None:
+        return _NOOP
+    return _Phase(phases, name)
+
+
+def add(name, seconds, phases=None):
+    """Add time to a phase of the current request."""
+    if phases is None:
+        phases = getattr(_local, "phases", None)
+        if phases is None:
+            return
+    phases[name] = phases.get(name, 0.0) + seconds
+
+
+def header(phases, total):
+    """Format phases as a Server-Timing header value (milliseconds)."""
+    metrics = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in phases.items()]
+    metrics.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(metrics)
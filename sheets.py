@@ -1,16 +1,44 @@
 """Google Sheets CRUD module for Elite Football Tracker."""
 import os
+import re
 import json
+import uuid
+import asyncio
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import gspread
+import google.auth.transport.requests
 from google.oauth2.service_account import Credentials
 
+from metrics import sheets_call
+
 # Constants
 DEFAULT_BANKROLL = 5000.0
 BANKROLL_CELL_ROW = 1
 BANKROLL_CELL_COL = 10
 MATCHES_SHEET = 0  # First sheet (index 0)
 COMPETITIONS_SHEET = "Competitions"
+ARCHIVE_SHEET = "Archive"  # Cold tier: matches of closed competitions
 RESULT_COL = 6
+ID_COL = 9
+ID_HEADER = "ID"
+DELETED_COL = 11  # Column J holds the bankroll cell, so tombstones go in K
+DELETED_HEADER = "Deleted"
+COMPACTION_BATCH_SIZE = 50  # Row ranges removed per spreadsheet batch request
+SHEETS_TIMEOUT = float(os.environ.get("SHEETS_TIMEOUT", 15))  # seconds per Sheets API request
+
+# Frozen stats written to the Competitions sheet when a competition is archived (columns K-O)
+SUMMARY_COL = 11
+SUMMARY_HEADERS = ["Total_Staked", "Total_Income", "Net_Profit", "Open_Loss", "Matches"]
+
+# Reads in get_all_data() run concurrently on a small thread pool (0 reads them one after another)
+SHEETS_PARALLEL_READS = os.environ.get("SHEETS_PARALLEL_READS", "1") == "1"
+
+_client = {"gc": None, "pid": None}
+_client_lock = threading.Lock()
+_read_pool = {"executor": None, "pid": None}
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
@@ -42,11 +70,19 @@ def get_sheet_id():
     return sheet_id
 
 
+def _get_client():
+    """The authorized gspread client, created once per process and reused (one pooled HTTP session)."""
+    with _client_lock:
+        if _client["gc"] is None or _client["pid"] != os.getpid():
+            gc = gspread.authorize(get_credentials())
+            gc.set_timeout(SHEETS_TIMEOUT)
+            _client.update(gc=gc, pid=os.getpid())
+        return _client["gc"]
+
+
 def get_spreadsheet():
     """Get authorized spreadsheet connection."""
-    creds = get_credentials()
-    gc = gspread.authorize(creds)
-    return gc.open_by_key(get_sheet_id())
+    return _get_client().open_by_key(get_sheet_id())
 
 
 def get_matches_worksheet():
@@ -61,117 +97,558 @@ def get_competitions_worksheet():
     return sh.worksheet(COMPETITIONS_SHEET)
 
 
+def new_match_id():
+    """Generate a stable match ID (independent of the match's sheet row)."""
+    return uuid.uuid4().hex[:12]
+
+
+class MatchMovedError(RuntimeError):
+    """A match is no longer at the sheet row the caller resolved (rows were removed since)."""
+
+
+def _check_match_rows(ws, rows):
+    """Raise MatchMovedError unless each row still holds its match ID. rows: {row: match_id}.
+
+    Only removing rows (compaction, archiving) moves matches, so a write against
+    a stale row number fails here instead of editing whichever match moved up.
+    Callers hold the row removal lock shared from this check until the write is done.
+    """
+    found = ws.batch_get([gspread.utils.rowcol_to_a1(row, ID_COL) for row in rows])
+    for (row, match_id), value in zip(rows.items(), found):
+        cell = value[0][0] if value and value[0] else ""
+        if cell.strip() != match_id:
+            raise MatchMovedError(f"Match {match_id} is no longer at row {row}, reload and try again")
+
+
+def _appended_row(response):
+    """Extract the sheet row number from an append_row API response (None if unknown)."""
+    try:
+        updated_range = response["updates"]["updatedRange"]
+    except (TypeError, KeyError):
+        return None
+    match = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(match.group(1)) if match else None
+
+
+def _match_column_updates(raw_values):
+    """Batch-update ranges assigning IDs to match rows that don't have one yet and writing the ID/Deleted headers.
+
+    Pads raw_values in place so every row has an ID column. New IDs are written
+    one range per run of consecutive rows missing one. Returns an empty list if
+    nothing is missing.
+    """
+    id_idx = ID_COL - 1
+    for row in raw_values:
+        row.extend([""] * (ID_COL - len(row)))
+
+    updates = []
+    header = raw_values[0]
+    if len(header) < DELETED_COL or header[DELETED_COL - 1].strip() != DELETED_HEADER:
+        header.extend([""] * (DELETED_COL - len(header)))
+        header[DELETED_COL - 1] = DELETED_HEADER
+        updates.append({
+            "range": gspread.utils.rowcol_to_a1(1, DELETED_COL),
+            "values": [[DELETED_HEADER]],
+        })
+
+    if header[id_idx].strip() != ID_HEADER:
+        header[id_idx] = ID_HEADER
+        updates.append({"range": gspread.utils.rowcol_to_a1(1, ID_COL), "values": [[ID_HEADER]]})
+
+    missing = []
+    for row_num, row in enumerate(raw_values[1:], start=2):
+        if not row[id_idx].strip() and any(cell.strip() for cell in row):
+            row[id_idx] = new_match_id()
+            missing.append(row_num)
+
+    # Only the blank cells are written, so IDs written meanwhile by another worker are kept
+    for first, last in _contiguous_runs(missing):
+        updates.append({
+            "range": f"{gspread.utils.rowcol_to_a1(first, ID_COL)}:{gspread.utils.rowcol_to_a1(last, ID_COL)}",
+            "values": [[raw_values[row_num - 1][id_idx]] for row_num in range(first, last + 1)],
+        })
+    return updates
+
+
+def _ensure_match_columns(ws, raw_values):
+    """Assign missing match IDs and headers (see _match_column_updates) in a single batch update."""
+    updates = _match_column_updates(raw_values)
+    if updates:
+        ws.batch_update(updates)
+
+
 # --- READ OPERATIONS ---
 
+def _match_records(raw_values):
+    """Match rows of the matches grid as dicts (with their sheet row number in _row)."""
+    if len(raw_values) < 2:
+        return []
+    headers = [h.strip() for h in raw_values[0]]
+    return [
+        dict(zip(headers, row), _row=row_num)
+        for row_num, row in enumerate(raw_values[1:], start=2)
+        if any(cell.strip() for cell in row)
+    ]
+
+
+def _competition_records(comp_values):
+    """Rows of the competitions grid as dicts."""
+    if len(comp_values) < 2:
+        return []
+    comp_headers = [h.strip() for h in comp_values[0]]
+    return [
+        dict(zip(comp_headers, row))
+        for row in comp_values[1:]
+        if any(cell.strip() for cell in row)
+    ]
+
+
+def _parse_bankroll(val):
+    """The bankroll cell as a number (DEFAULT_BANKROLL if empty or unreadable)."""
+    try:
+        return float(str(val).replace(',', '').replace('₪', '').strip()) if val else DEFAULT_BANKROLL
+    except ValueError:
+        return DEFAULT_BANKROLL
+
+
+def _read_matches(matches_ws):
+    raw_values = matches_ws.get_all_values()
+    if len(raw_values) > 1:
+        _ensure_match_columns(matches_ws, raw_values)
+    return _match_records(raw_values)
+
+
+def _read_competitions(sh):
+    try:
+        return _competition_records(sh.worksheet(COMPETITIONS_SHEET).get_all_values())
+    except gspread.WorksheetNotFound:
+        return []
+
+
+def _read_bankroll(matches_ws):
+    return _parse_bankroll(matches_ws.cell(BANKROLL_CELL_ROW, BANKROLL_CELL_COL).value)
+
+
+def _read_executor():
+    """Thread pool for concurrent sheet reads (created on first use, and again after a fork)."""
+    with _client_lock:
+        if _read_pool["executor"] is None or _read_pool["pid"] != os.getpid():
+            _read_pool.update(executor=ThreadPoolExecutor(max_workers=3, thread_name_prefix="sheets-read"), pid=os.getpid())
+        return _read_pool["executor"]
+
+
+def _run_reads(reads):
+    """Run (label, read, arg) calls and return their results in order, or raise the first failure.
+
+    With SHEETS_PARALLEL_READS they run concurrently and all share one
+    SHEETS_TIMEOUT deadline, so the total wait is that of the slowest read. A
+    failure is re-raised as RuntimeError("Could not read <label>: ...").
+    """
+    if not SHEETS_PARALLEL_READS:
+        results = []
+        for label, read, arg in reads:
+            try:
+                results.append(read(arg))
+            except Exception as e:
+                raise RuntimeError(f"Could not read {label}: {e}") from e
+        return results
+
+    deadline = time.monotonic() + SHEETS_TIMEOUT
+    futures = [(label, _read_executor().submit(read, arg)) for label, read, arg in reads]
+    results = []
+    try:
+        for label, future in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeout:
+                raise RuntimeError(f"Could not read {label}: timed out after {SHEETS_TIMEOUT:g}s") from None
+            except Exception as e:
+                raise RuntimeError(f"Could not read {label}: {e}") from e
+    finally:
+        for _, future in futures:
+            future.cancel()
+    return results
+
+
+@sheets_call("read", failed=lambda result: result[3])
 def get_all_data():
-    """Read all data from Google Sheets. Returns (matches_data, bankroll, competitions_data, error)."""
+    """Read all data from Google Sheets. Returns (matches_data, bankroll, competitions_data, error).
+
+    The matches grid, the competitions grid and the bankroll cell are read
+    concurrently (see _run_reads). A failed read of either worksheet or of the
+    bankroll cell is reported as an error rather than returned as empty data, so
+    it can't be mistaken for a (wrong) balance.
+    """
     try:
         sh = get_spreadsheet()
     except Exception as e:
         return [], DEFAULT_BANKROLL, [], str(e)
 
-    # Read matches
     try:
         matches_ws = sh.get_worksheet(MATCHES_SHEET)
-        raw_values = matches_ws.get_all_values()
-        if len(raw_values) > 1:
-            headers = [h.strip() for h in raw_values[0]]
-            matches_data = [
-                dict(zip(headers, row))
-                for row in raw_values[1:]
-                if any(cell.strip() for cell in row)
-            ]
-        else:
-            matches_data = []
     except Exception as e:
-        matches_data = []
+        return [], DEFAULT_BANKROLL, [], f"Could not read matches: {e}"
 
-    # Read competitions
     try:
-        comp_ws = sh.worksheet(COMPETITIONS_SHEET)
-        comp_values = comp_ws.get_all_values()
-        if len(comp_values) > 1:
-            comp_headers = [h.strip() for h in comp_values[0]]
-            competitions_data = [
-                dict(zip(comp_headers, row))
-                for row in comp_values[1:]
-                if any(cell.strip() for cell in row)
-            ]
-        else:
-            competitions_data = []
+        matches_data, competitions_data, bankroll = _run_reads([
+            ("matches", _read_matches, matches_ws),
+            ("competitions", _read_competitions, sh),
+            ("bankroll", _read_bankroll, matches_ws),
+        ])
+    except RuntimeError as e:
+        return [], DEFAULT_BANKROLL, [], str(e)
+
+    return matches_data, bankroll, competitions_data, None
+
+
+# --- ASYNC READS (ASGI mode, see asgi.py) ---
+# The same reads as get_all_data() straight over the Sheets REST API with an
+# httpx.AsyncClient, so a refresh waits on the network without holding a thread.
+SHEETS_API = "https://sheets.googleapis.com/v4/spreadsheets"
+_api_credentials = {"creds": None}
+
+
+def _access_token():
+    """OAuth token for direct Sheets API calls, refreshed when expired (blocking: run it in a thread)."""
+    creds = _api_credentials["creds"]
+    if creds is None:
+        creds = _api_credentials["creds"] = get_credentials()
+    if not creds.valid:
+        creds.refresh(google.auth.transport.requests.Request())
+    return creds.token
+
+
+def _sheet_range(title, a1=None):
+    """A1 range on a worksheet by title (quoted as the API requires)."""
+    quoted = "'" + title.replace("'", "''") + "'"
+    return f"{quoted}!{a1}" if a1 else quoted
+
+
+def _padded(values):
+    """Pad ragged API rows to a rectangle, like gspread's get_all_values()."""
+    width = max((len(row) for row in values), default=0)
+    return [row + [""] * (width - len(row)) for row in values]
+
+
+async def get_all_data_async(client):
+    """Non-blocking get_all_data() using an httpx.AsyncClient. Same return value and errors.
+
+    One request reads the worksheet titles, one batchGet reads the matches grid,
+    the bankroll cell and the competitions grid; missing IDs are written back
+    with one values:batchUpdate.
+    """
+    try:
+        token = await asyncio.to_thread(_access_token)
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"{SHEETS_API}/{get_sheet_id()}"
+        response = await client.get(url, params={"fields": "sheets.properties.title"}, headers=headers)
+        response.raise_for_status()
+        titles = [sheet["properties"]["title"] for sheet in response.json()["sheets"]]
     except Exception as e:
-        competitions_data = []
+        return [], DEFAULT_BANKROLL, [], str(e)
 
-    # Read bankroll
+    matches_title = titles[MATCHES_SHEET]
+    ranges = [
+        _sheet_range(matches_title),
+        _sheet_range(matches_title, gspread.utils.rowcol_to_a1(BANKROLL_CELL_ROW, BANKROLL_CELL_COL)),
+    ]
+    if COMPETITIONS_SHEET in titles:
+        ranges.append(_sheet_range(COMPETITIONS_SHEET))
     try:
-        val = matches_ws.cell(BANKROLL_CELL_ROW, BANKROLL_CELL_COL).value
-        bankroll = float(str(val).replace(',', '').replace('₪', '').strip()) if val else DEFAULT_BANKROLL
-    except Exception:
-        bankroll = DEFAULT_BANKROLL
+        response = await client.get(f"{url}/values:batchGet", params={"ranges": ranges}, headers=headers)
+        response.raise_for_status()
+        grids = [value_range.get("values", []) for value_range in response.json()["valueRanges"]]
+    except Exception as e:
+        return [], DEFAULT_BANKROLL, [], f"Could not read sheets: {e}"
 
-    return matches_data, bankroll, competitions_data, None
+    raw_values = _padded(grids[0])
+    try:
+        updates = _match_column_updates(raw_values) if len(raw_values) > 1 else []
+        if updates:
+            response = await client.post(f"{url}/values:batchUpdate", headers=headers, json={
+                "valueInputOption": "RAW",
+                "data": [dict(update, range=_sheet_range(matches_title, update["range"])) for update in updates],
+            })
+            response.raise_for_status()
+    except Exception as e:
+        return [], DEFAULT_BANKROLL, [], f"Could not read matches: {e}"
+
+    bankroll_cell = grids[1][0][0] if grids[1] and grids[1][0] else None
+    competitions_data = _competition_records(_padded(grids[2])) if len(grids) > 2 else []
+    return _match_records(raw_values), _parse_bankroll(bankroll_cell), competitions_data, None
 
 
 # --- WRITE OPERATIONS ---
 
+@sheets_call("update")
 def update_bankroll(new_amount):
     """Update bankroll cell value."""
     ws = get_matches_worksheet()
     ws.update_cell(BANKROLL_CELL_ROW, BANKROLL_CELL_COL, new_amount)
 
 
+@sheets_call("append")
 def add_match(date, competition, home, away, odds, result, stake):
-    """Append a new match row to the matches sheet."""
+    """Append a new match row to the matches sheet.
+
+    Returns: (match_id, row) — row is None if the API response didn't include it.
+    """
+    ws = get_matches_worksheet()
+    match_id = new_match_id()
+    new_row = [date, competition, home, away, odds, result, stake, 0, match_id]
+    response = ws.append_row(new_row)
+    return match_id, _appended_row(response)
+
+
+@sheets_call("append")
+def append_matches(matches):
+    """Append several match rows in one request.
+
+    matches: list of (date, competition, home, away, odds, result, stake) tuples.
+    Returns the new match IDs, in order.
+    """
     ws = get_matches_worksheet()
-    new_row = [date, competition, home, away, odds, result, stake, 0]
-    ws.append_row(new_row)
+    ids = [new_match_id() for _ in matches]
+    ws.append_rows([
+        [date, competition, home, away, odds, result, stake, 0, match_id]
+        for (date, competition, home, away, odds, result, stake), match_id in zip(matches, ids)
+    ])
+    return ids
 
 
-def update_match_result(row, result):
+@sheets_call("update")
+def update_match_result(row, match_id, result):
     """Update the result column for a specific match row."""
     ws = get_matches_worksheet()
+    _check_match_rows(ws, {row: match_id})
     ws.update_cell(row, RESULT_COL, result)
 
 
-def update_match(row, date, home, away, odds, result, stake):
+def _match_edit_cells(row, date, home, away, odds, result, stake):
+    """Batch-update ranges writing all editable fields of a match row (column B, the competition, is kept)."""
+    return [
+        {"range": gspread.utils.rowcol_to_a1(row, 1), "values": [[date]]},
+        {
+            "range": f"{gspread.utils.rowcol_to_a1(row, 3)}:{gspread.utils.rowcol_to_a1(row, 7)}",
+            "values": [[home, away, odds, result, stake]],
+        },
+    ]
+
+
+@sheets_call("update")
+def update_match(row, match_id, date, home, away, odds, result, stake):
     """Update all fields of a match row."""
     ws = get_matches_worksheet()
-    ws.update_cell(row, 1, date)
-    ws.update_cell(row, 3, home)
-    ws.update_cell(row, 4, away)
-    ws.update_cell(row, 5, odds)
-    ws.update_cell(row, 6, result)
-    ws.update_cell(row, 7, stake)
+    _check_match_rows(ws, {row: match_id})
+    ws.batch_update(_match_edit_cells(row, date, home, away, odds, result, stake))
+
+
+@sheets_call("update")
+def update_matches(mutations):
+    """Apply several match writes in a single batch update.
+
+    mutations: list of dicts with the sheet "row", the match "id" and an "op": "result" (with
+    "result"), "edit" (with date, home, away, odds, result, stake) or "delete".
+    Returns the tombstone value written for deletes.
+    """
+    tombstone = str(datetime.date.today())
+    updates = []
+    for m in mutations:
+        if m["op"] == "result":
+            updates.append({"range": gspread.utils.rowcol_to_a1(m["row"], RESULT_COL), "values": [[m["result"]]]})
+        elif m["op"] == "edit":
+            updates += _match_edit_cells(
+                m["row"], m["date"], m["home"], m["away"], m["odds"], m["result"], m["stake"]
+            )
+        elif m["op"] == "delete":
+            updates.append({"range": gspread.utils.rowcol_to_a1(m["row"], DELETED_COL), "values": [[tombstone]]})
+    if updates:
+        ws = get_matches_worksheet()
+        _check_match_rows(ws, {m["row"]: m["id"] for m in mutations})
+        ws.batch_update(updates)
+    return tombstone
+
+
+@sheets_call("delete")
+def delete_match(row, match_id):
+    """Soft-delete a match by writing a tombstone (the deletion date) into its Deleted cell.
+
+    The row stays in place until compact_matches() removes it, so no other row shifts.
+    Returns the tombstone value written.
+    """
+    ws = get_matches_worksheet()
+    _check_match_rows(ws, {row: match_id})
+    tombstone = str(datetime.date.today())
+    ws.update_cell(row, DELETED_COL, tombstone)
+    return tombstone
+
+
+def _contiguous_runs(rows):
+    """Group sorted row numbers into (first, last) runs of consecutive rows."""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
 
 
-def delete_match(row):
-    """Delete a match row from the sheet."""
-    ws = get_matches_worksheet()
-    ws.delete_rows(row)
+@sheets_call("read")
+def tombstoned_rows():
+    """Sheet rows of the soft-deleted matches, ascending."""
+    tombstones = get_matches_worksheet().col_values(DELETED_COL)
+    return [row_num for row_num, value in enumerate(tombstones[1:], start=2) if value.strip()]
 
 
+@sheets_call("delete")
+def compact_matches(rows):
+    """Physically remove tombstoned match rows (see tombstoned_rows()).
+
+    Runs are deleted bottom-up so earlier row numbers stay valid, with up to
+    COMPACTION_BATCH_SIZE ranges per spreadsheet batch request. Like
+    archive_matches(), callers must hold the row removal lock, from before
+    reading the rows until they are removed.
+    """
+    sh = get_spreadsheet()
+    _delete_rows(sh, sh.get_worksheet(MATCHES_SHEET), rows)
+
+
+def _delete_rows(sh, ws, rows):
+    """Delete the given sorted row numbers from ws, bottom-up, in batched deleteDimension requests."""
+    runs = _contiguous_runs(rows)[::-1]
+    for start in range(0, len(runs), COMPACTION_BATCH_SIZE):
+        sh.batch_update({"requests": [
+            {"deleteDimension": {"range": {
+                "sheetId": ws.id,
+                "dimension": "ROWS",
+                "startIndex": first - 1,
+                "endIndex": last,
+            }}}
+            for first, last in runs[start:start + COMPACTION_BATCH_SIZE]
+        ]})
+
+
+@sheets_call("append")
 def add_competition(name, description, default_stake, color1, color2, text_color, logo_url):
-    """Add a new competition to the Competitions sheet."""
+    """Add a new competition to the Competitions sheet.
+
+    Returns: (created_date, row) — row is None if the API response didn't include it.
+    """
     ws = get_competitions_worksheet()
-    import datetime
+    created_date = str(datetime.date.today())
     new_row = [
         name, description, default_stake,
         color1, color2, text_color,
         logo_url, "Active",
-        str(datetime.date.today()), ""
+        created_date, ""
     ]
-    ws.append_row(new_row)
+    response = ws.append_row(new_row)
+    return created_date, _appended_row(response)
 
 
+@sheets_call("update")
 def update_competition_stake(row, new_stake):
     """Update the default stake for a competition."""
     ws = get_competitions_worksheet()
     ws.update_cell(row, 3, new_stake)
 
 
-def close_competition(row):
-    """Close a competition (set status to Closed + add closed date)."""
-    import datetime
+@sheets_call("update")
+def close_competition(row, summary=None):
+    """Close a competition (set status to Closed + add closed date).
+
+    If summary is given (dict keyed by SUMMARY_HEADERS) its values are frozen
+    into the competition row, all in one batch update. Returns the closed date.
+    """
     ws = get_competitions_worksheet()
-    ws.update_cell(row, 8, "Closed")
-    ws.update_cell(row, 10, str(datetime.date.today()))
+    closed_date = str(datetime.date.today())
+    updates = [
+        {"range": gspread.utils.rowcol_to_a1(row, 8), "values": [["Closed"]]},
+        {"range": gspread.utils.rowcol_to_a1(row, 10), "values": [[closed_date]]},
+    ]
+    if summary is not None:
+        first = gspread.utils.rowcol_to_a1(1, SUMMARY_COL)
+        last = gspread.utils.rowcol_to_a1(1, SUMMARY_COL + len(SUMMARY_HEADERS) - 1)
+        updates.append({"range": f"{first}:{last}", "values": [SUMMARY_HEADERS]})
+        updates.append({
+            "range": gspread.utils.rowcol_to_a1(row, SUMMARY_COL),
+            "values": [[summary[h] for h in SUMMARY_HEADERS]],
+        })
+    ws.batch_update(updates)
+    return closed_date
+
+
+def _get_archive_worksheet(sh, header):
+    """Get the archive worksheet, creating it with the matches header if it doesn't exist."""
+    try:
+        return sh.worksheet(ARCHIVE_SHEET)
+    except gspread.exceptions.WorksheetNotFound:
+        ws = sh.add_worksheet(ARCHIVE_SHEET, rows=1, cols=len(header))
+        ws.append_row(header)
+        return ws
+
+
+@sheets_call("archive")
+def archive_matches(competition):
+    """Move a competition's matches from the matches sheet to the archive worksheet.
+
+    Tombstoned rows are dropped instead of archived. Returns the sorted sheet
+    rows removed from the matches sheet (the rows below them shift up). Callers
+    must hold the row removal lock so no other worker removes rows in between.
+    """
+    sh = get_spreadsheet()
+    ws = sh.get_worksheet(MATCHES_SHEET)
+    raw_values = ws.get_all_values()
+    if len(raw_values) < 2:
+        return []
+
+    headers = [h.strip() for h in raw_values[0]]
+    comp_idx = headers.index("Competition")
+    rows, moved = [], []
+    for row_num, row in enumerate(raw_values[1:], start=2):
+        if len(row) > comp_idx and row[comp_idx].strip() == competition:
+            rows.append(row_num)
+            if not (len(row) >= DELETED_COL and row[DELETED_COL - 1].strip()):
+                moved.append(row[:ID_COL])
+
+    if moved:
+        archive_ws = _get_archive_worksheet(sh, raw_values[0][:ID_COL])
+        archive_ws.append_rows(moved)
+    _delete_rows(sh, ws, rows)
+    return rows
+
+
+@sheets_call("read")
+def get_competitions():
+    """Read the Competitions worksheet. Returns a list of dicts (empty if there is none)."""
+    try:
+        ws = get_competitions_worksheet()
+    except gspread.WorksheetNotFound:
+        return []
+
+    values = ws.get_all_values()
+    if len(values) < 2:
+        return []
+    headers = [h.strip() for h in values[0]]
+    return [dict(zip(headers, row)) for row in values[1:] if any(cell.strip() for cell in row)]
+
+
+@sheets_call("read")
+def get_archived_matches():
+    """Read all rows of the archive worksheet. Returns a list of dicts (empty if there is no archive)."""
+    sh = get_spreadsheet()
+    try:
+        ws = sh.worksheet(ARCHIVE_SHEET)
+    except gspread.exceptions.WorksheetNotFound:
+        return []
+
+    values = ws.get_all_values()
+    if len(values) < 2:
+        return []
+    headers = [h.strip() for h in values[0]]
+    return [
+        dict(zip(headers, row), _row=row_num)
+        for row_num, row in enumerate(values[1:], start=2)
+        if any(cell.strip() for cell in row)
+    ]
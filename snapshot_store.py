@@ -0,0 +1,226 @@
+"""Shared snapshot store for Elite Football Tracker.
+
+Gunicorn workers share the processed snapshot and a generation counter through a
+small SQLite file. Every request does one cheap single-row read of the counters;
+a write in any worker bumps the generation, which invalidates every worker, and
+a refresh lease makes sure only one worker re-downloads the sheet.
+
+The snapshot itself is persisted next to the database in a memory-mappable
+file (pickle protocol 5 with the column buffers stored out-of-band), so a cold
+start can serve it without copying the DataFrame columns into memory.
+
+Unpickling runs whatever the file says, so by default both files live in a
+directory only the app's user can access (STATE_DIR, created with mode 0700 in
+the temp directory). A SNAPSHOT_DB set explicitly must be somewhere equally private.
+"""
+import mmap
+import os
+import pickle
+import sqlite3
+import stat
+import struct
+import tempfile
+import threading
+import time
+
+
+
+def _private_dir(path):
+    """Create path with mode 0700 if needed and make sure no other user can write to it."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):  # Windows: the temp directory is already per user
+        return path
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} must be a directory owned and only accessible by this user")
+    return path
+
+
+_uid = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+STATE_DIR = os.path.join(tempfile.gettempdir(), f"elite-football-tracker-{_uid}")
+SNAPSHOT_DB = os.environ.get("SNAPSHOT_DB") or os.path.join(_private_dir(STATE_DIR), "snapshot.db")
+SNAPSHOT_FILE = os.environ.get("SNAPSHOT_FILE", SNAPSHOT_DB + ".snapshot")
+
+# File layout: magic, generation, buffer count, (offset, length) of the pickle
+# stream and of every out-of-band buffer, then the data at 64-byte boundaries.
+_MAGIC = b"EFTSNAP1"
+_ALIGN = 64
+
+_local = threading.local()
+
+
+def _connect():
+    """Get this thread's connection to the store (created on first use, and again after a fork)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = sqlite3.connect(SNAPSHOT_DB, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1),"
+            " generation INTEGER NOT NULL,"
+            " snapshot_generation INTEGER NOT NULL,"
+            " timestamp REAL NOT NULL,"
+            " lease_until REAL NOT NULL,"
+            " last_write REAL NOT NULL)"
+        )
+        conn.execute("INSERT OR IGNORE INTO state VALUES (1, 0, -1, 0, 0, 0)")
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+def read_state():
+    """Read the shared counters.
+
+    Returns: dict with generation (current data version), snapshot_generation
+    (version of the stored snapshot), timestamp (when it was stored) and
+    last_write (time of the last invalidation).
+    """
+    row = _connect().execute(
+        "SELECT generation, snapshot_generation, timestamp, last_write FROM state WHERE id = 1"
+    ).fetchone()
+    return {
+        "generation": row[0],
+        "snapshot_generation": row[1],
+        "timestamp": row[2],
+        "last_write": row[3],
+    }
+
+
+def bump_generation():
+    """Invalidate the stored snapshot for all workers. Returns the new generation."""
+    conn = _connect()
+    conn.execute(
+        "UPDATE state SET generation = generation + 1, last_write = ? WHERE id = 1", (time.time(),)
+    )
+    return read_state()["generation"]
+
+
+def save_snapshot(data, generation):
+    """Store a full refresh of data version `generation` as the next generation.
+
+    Nothing is stored if the generation was bumped while the snapshot was being
+    built. Returns the new generation, or None if nothing was stored.
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if read_state()["generation"] != generation:
+            conn.execute("ROLLBACK")
+            return None
+        generation += 1
+        _write_snapshot_file(data, generation)
+        conn.execute(
+            "UPDATE state SET generation = ?, snapshot_generation = ?, timestamp = ? WHERE id = 1",
+            (generation, generation, time.time()),
+        )
+        conn.execute("COMMIT")
+        return generation
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def touch_snapshot(generation):
+    """Mark the stored snapshot as fresh after a refresh found no changes.
+
+    Returns True if `generation` was still the current, stored version.
+    """
+    cursor = _connect().execute(
+        "UPDATE state SET timestamp = ? WHERE id = 1 AND generation = ? AND snapshot_generation = ?",
+        (time.time(), generation, generation),
+    )
+    return cursor.rowcount == 1
+
+
+def publish_snapshot(data, base_generation):
+    """Store a write-through patched snapshot as the next generation.
+
+    Only succeeds if the stored snapshot is still the one the patch was applied
+    to (base_generation). The stored timestamp is kept, so patches don't postpone
+    the scheduled full refresh. Returns True on success.
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        state = read_state()
+        if state["generation"] != base_generation or state["snapshot_generation"] != base_generation:
+            conn.execute("ROLLBACK")
+            return False
+        generation = base_generation + 1
+        _write_snapshot_file(data, generation)
+        conn.execute(
+            "UPDATE state SET generation = ?, snapshot_generation = ?, last_write = ? WHERE id = 1",
+            (generation, generation, time.time()),
+        )
+        conn.execute("COMMIT")
+        return True
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _write_snapshot_file(data, generation):
+    """Write the snapshot file atomically (temp file + rename)."""
+    buffers = []
+    stream = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+    chunks = [memoryview(stream)] + [buffer.raw() for buffer in buffers]
+
+    header_size = len(_MAGIC) + 16 + 16 * len(chunks)
+    entries, offset = [], header_size
+    for chunk in chunks:
+        offset += -offset % _ALIGN
+        entries.append((offset, chunk.nbytes))
+        offset += chunk.nbytes
+
+    tmp_path = f"{SNAPSHOT_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC + struct.pack("<qQ", generation, len(buffers)))
+        for entry in entries:
+            f.write(struct.pack("<QQ", *entry))
+        for (start, _), chunk in zip(entries, chunks):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(chunk)
+    os.replace(tmp_path, SNAPSHOT_FILE)
+
+
+def load_snapshot():
+    """Load the persisted snapshot. Returns (generation, data), or (None, None) if there is none.
+
+    The file is memory-mapped and the DataFrame column buffers are used in place
+    (read-only). Windows can't replace a mapped file, so there it is read instead.
+    """
+    try:
+        with open(SNAPSHOT_FILE, "rb") as f:
+            if os.name == "nt":
+                view = memoryview(f.read())
+            else:
+                view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except (FileNotFoundError, ValueError):
+        return None, None
+
+    if view[:len(_MAGIC)] != _MAGIC:
+        return None, None
+    generation, count = struct.unpack_from("<qQ", view, len(_MAGIC))
+    entries = [
+        struct.unpack_from("<QQ", view, len(_MAGIC) + 16 + 16 * i)
+        for i in range(count + 1)
+    ]
+    chunks = [view[start:start + length] for start, length in entries]
+    return generation, pickle.loads(chunks[0], buffers=chunks[1:])
+
+
+def acquire_lease(seconds):
+    """Try to take the deployment-wide refresh lease for `seconds`. Returns True on success."""
+    now = time.time()
+    cursor = _connect().execute(
+        "UPDATE state SET lease_until = ? WHERE id = 1 AND lease_until < ?", (now + seconds, now)
+    )
+    return cursor.rowcount == 1
+
+
+def release_lease():
+    """Release the refresh lease."""
+    _connect().execute("UPDATE state SET lease_until = 0 WHERE id = 1")
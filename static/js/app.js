@@ -39,6 +39,94 @@ function showToast(message, type = 'success') {
     setTimeout(() => toast.remove(), 3000);
 }
 
+// --- In-place Updates ---
+// Mutation endpoints answer with the changed match cards, competition summary
+// and balance, which are patched into the page instead of reloading it. Only
+// the match just added (addedId) gets a new card; other changed matches that
+// aren't on the page (filtered out, or not scrolled to yet) are left off it.
+function applyUpdate(data, addedId = null) {
+    if (data.generation) lastGeneration = Math.max(lastGeneration, data.generation);
+    const list = document.getElementById('match-list');
+    const matches = data.matches || [];
+    if (matches.length && !list && document.getElementById('competition-summary')) {
+        location.reload();  // First match of the competition: the list isn't on the page yet
+        return;
+    }
+
+    (data.removed || []).forEach(id => document.getElementById(`match-${id}`)?.remove());
+    for (const match of matches) {
+        const card = document.getElementById(`match-${match.id}`);
+        if (card) {
+            card.outerHTML = match.html;
+        } else if (list && match.id === addedId) {
+            list.insertAdjacentHTML('afterbegin', match.html);
+        }
+    }
+
+    const summary = document.getElementById('competition-summary');
+    if (summary && data.summary_html) summary.outerHTML = data.summary_html;
+
+    const stakeInput = document.querySelector('#add-match-form [name="stake"]');
+    if (stakeInput && data.competition) stakeInput.value = Math.round(data.competition.next_bet);
+
+    if (data.balance) updateBalance(data.balance);
+}
+
+function updateBalance(balance) {
+    const up = balance.current_bal >= balance.bankroll;
+    document.querySelectorAll('[data-current-balance]').forEach(el => el.textContent = `₪${balance.display}`);
+    document.querySelectorAll('[data-bankroll]').forEach(el => el.textContent = `₪${balance.bankroll_display}`);
+    document.querySelectorAll('[data-balance-colored]').forEach(el => {
+        el.classList.toggle('text-success', up);
+        el.classList.toggle('text-error', !up);
+    });
+    document.querySelectorAll('[data-balance-change]').forEach(el => {
+        el.classList.toggle('text-success', up);
+        el.classList.toggle('text-error', !up);
+        el.innerHTML = `<span class="material-symbols-outlined text-sm">${up ? 'trending_up' : 'trending_down'}</span>
+                        ${Math.abs(balance.change_pct).toFixed(1)}%${up ? '+' : ''}`;
+    });
+}
+
+// --- Live Updates (Server-Sent Events) ---
+// Changes made elsewhere arrive as compact deltas; the balance is patched
+// directly, and this competition's changed cards are fetched re-rendered.
+let lastGeneration = Number(document.body.dataset.generation) || 0;
+
+async function refreshCompetition(name, ids, removed) {
+    const url = `/competition/${encodeURIComponent(name)}/cards?ids=${encodeURIComponent(ids.join(','))}`;
+    const res = await fetch(url);
+    if (!res.ok) return;
+    const data = await res.json();
+    data.removed = removed;
+    applyUpdate(data);
+}
+
+function startLiveUpdates() {
+    if (!('EventSource' in window)) return;
+    const source = new EventSource('/api/events');
+    source.addEventListener('update', function(e) {
+        const delta = JSON.parse(e.data);
+        if (delta.generation <= lastGeneration) return;  // Already applied (our own write)
+        lastGeneration = delta.generation;
+
+        const summary = document.getElementById('competition-summary');
+        const name = summary ? summary.dataset.competition : null;
+        if (delta.structure_changed && !summary) {
+            location.reload();
+            return;
+        }
+        updateBalance(delta.balance);
+        if (name && delta.competitions[name]) {
+            const ids = delta.matches.filter(m => m.competition === name).map(m => m.id);
+            refreshCompetition(name, ids, delta.removed);
+        }
+    });
+    source.addEventListener('resync', () => location.reload());
+}
+
+document.addEventListener('DOMContentLoaded', startLiveUpdates);
+
 // --- Bankroll Modal ---
 function toggleBankrollModal() {
     const modal = document.getElementById('bankroll-modal');
@@ -62,7 +150,9 @@ async function bankrollAction(action) {
         const data = await res.json();
         if (data.ok) {
             showToast(`${action === 'deposit' ? 'Deposited' : 'Withdrawn'} ₪${amount}`);
-            setTimeout(() => location.reload(), 800);
+            applyUpdate(data);
+            toggleBankrollModal();
+            hideLoader();
         } else {
             showToast(data.error || 'Operation failed', 'error');
             hideLoader();
@@ -103,7 +193,9 @@ async function addMatch(event, competition) {
         const data = await res.json();
         if (data.ok) {
             showToast(`Added: ${body.home} vs ${body.away}`);
-            setTimeout(() => location.reload(), 800);
+            form.reset();
+            applyUpdate(data, data.id);
+            hideLoader();
         } else {
             showToast(data.error || 'Failed to add match', 'error');
             hideLoader();
@@ -116,10 +208,10 @@ async function addMatch(event, competition) {
 }
 
 // --- Set Match Result (WIN/LOSS) ---
-async function setResult(row, result) {
+async function setResult(matchId, result) {
     showLoader();
     try {
-        const res = await fetch(`/api/match/${row}/result`, {
+        const res = await fetch(`/api/match/${matchId}/result`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ result })
@@ -128,7 +220,97 @@ async function setResult(row, result) {
         if (data.ok) {
             const label = result === 'Draw (X)' ? 'WIN' : 'LOSS';
             showToast(`Match marked as ${label}`);
-            setTimeout(() => location.reload(), 800);
+            applyUpdate(data);
+            hideLoader();
+        } else {
+            showToast(data.error || 'Failed to update', 'error');
+            hideLoader();
+        }
+    } catch (e) {
+        showToast('Network error', 'error');
+        hideLoader();
+    }
+}
+
+// --- Match History Pagination (infinite scroll) ---
+async function loadMoreMatches(button) {
+    if (button.dataset.loading) return;
+    button.dataset.loading = '1';
+    try {
+        const url = new URL(button.dataset.url, location.origin);
+        url.searchParams.set('cursor', button.dataset.cursor);
+        const res = await fetch(url);
+        if (!res.ok) throw new Error(res.statusText);
+        document.getElementById('match-list').insertAdjacentHTML('beforeend', await res.text());
+        const next = res.headers.get('X-Next-Cursor');
+        if (next) {
+            button.dataset.cursor = next;
+        } else {
+            button.remove();
+        }
+    } catch (e) {
+        showToast('Could not load more matches', 'error');
+    } finally {
+        delete button.dataset.loading;
+    }
+}
+
+// Load the next page automatically when the button scrolls into view
+document.addEventListener('DOMContentLoaded', function() {
+    const button = document.getElementById('load-more-matches');
+    if (!button || !('IntersectionObserver' in window)) return;
+    const observer = new IntersectionObserver(function(entries) {
+        if (!button.isConnected) {
+            observer.disconnect();
+        } else if (entries.some(entry => entry.isIntersecting)) {
+            loadMoreMatches(button);
+        }
+    }, { rootMargin: '200px' });
+    observer.observe(button);
+});
+
+// --- Settle Selected Matches (batch) ---
+function selectedMatchIds() {
+    return [...document.querySelectorAll('.settle-select:checked')].map(el => el.value);
+}
+
+function updateSettleBar() {
+    const bar = document.getElementById('settle-bar');
+    if (!bar) return;
+    const count = selectedMatchIds().length;
+    document.getElementById('settle-count').textContent = count;
+    document.getElementById('settle-select-all').checked =
+        count > 0 && count === document.querySelectorAll('.settle-select').length;
+    bar.classList.toggle('hidden', count === 0);
+}
+
+function toggleSelectAll(checked) {
+    document.querySelectorAll('.settle-select').forEach(el => el.checked = checked);
+    updateSettleBar();
+}
+
+document.addEventListener('change', function(e) {
+    if (e.target.classList.contains('settle-select')) updateSettleBar();
+});
+
+async function settleSelected(result) {
+    const ids = selectedMatchIds();
+    if (!ids.length) return;
+
+    showLoader();
+    try {
+        const res = await fetch('/api/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ mutations: ids.map(id => ({ op: 'result', id, result })) })
+        });
+        const data = await res.json();
+        if (data.ok) {
+            const label = result === 'Draw (X)' ? 'WIN' : 'LOSS';
+            showToast(`${data.updated} matches marked as ${label}`);
+            applyUpdate(data);
+            updateSettleBar();
+            hideLoader();
         } else {
             showToast(data.error || 'Failed to update', 'error');
             hideLoader();
@@ -140,8 +322,8 @@ async function setResult(row, result) {
 }
 
 // --- Edit Match Modal ---
-function openEditModal(row, home, away, odds, stake, status, date) {
-    document.getElementById('edit-row').value = row;
+function openEditModal(matchId, home, away, odds, stake, status, date) {
+    document.getElementById('edit-id').value = matchId;
     document.getElementById('edit-home').value = home;
     document.getElementById('edit-away').value = away;
     document.getElementById('edit-odds').value = odds;
@@ -163,7 +345,7 @@ function closeEditModal() {
 
 async function saveEdit(event) {
     event.preventDefault();
-    const row = parseInt(document.getElementById('edit-row').value);
+    const matchId = document.getElementById('edit-id').value;
     const body = {
         home: document.getElementById('edit-home').value,
         away: document.getElementById('edit-away').value,
@@ -175,7 +357,7 @@ async function saveEdit(event) {
 
     showLoader();
     try {
-        const res = await fetch(`/api/match/${row}/edit`, {
+        const res = await fetch(`/api/match/${matchId}/edit`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(body)
@@ -183,7 +365,9 @@ async function saveEdit(event) {
         const data = await res.json();
         if (data.ok) {
             showToast('Match updated');
-            setTimeout(() => location.reload(), 800);
+            closeEditModal();
+            applyUpdate(data);
+            hideLoader();
         } else {
             showToast(data.error || 'Failed to update', 'error');
             hideLoader();
@@ -196,19 +380,21 @@ async function saveEdit(event) {
 }
 
 async function deleteMatch() {
-    const row = parseInt(document.getElementById('edit-row').value);
+    const matchId = document.getElementById('edit-id').value;
     if (!confirm('Are you sure you want to delete this match?')) return;
 
     showLoader();
     try {
-        const res = await fetch(`/api/match/${row}/delete`, {
+        const res = await fetch(`/api/match/${matchId}/delete`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' }
         });
         const data = await res.json();
         if (data.ok) {
             showToast('Match deleted');
-            setTimeout(() => location.reload(), 800);
+            closeEditModal();
+            applyUpdate(data);
+            hideLoader();
         } else {
             showToast(data.error || 'Failed to delete', 'error');
             hideLoader();
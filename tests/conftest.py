@@ -0,0 +1,56 @@
+"""Shared fixtures. The app runs against a throwaway snapshot store, with no warm
+start and no compaction thread, and reads a small in-memory sheet instead of
+Google Sheets."""
+import os
+import sys
+import tempfile
+
+os.environ["SNAPSHOT_DB"] = os.path.join(tempfile.mkdtemp(), "snapshot.db")
+os.environ["WARM_START"] = "0"
+os.environ["COMPACTION_INTERVAL"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import sheets
+
+MATCHES = [
+    ["Date", "Competition", "Home Team", "Away Team", "Odds", "Result", "Stake", "Profit", "ID", "5000", "Deleted"],
+    ["2025-01-03", "Serie A", "Roma", "Lazio", "3.2", "No Draw", "30", "0", "m1", "", ""],
+    ["04/01/2025", "Serie A", "Milan", "Inter", "3.1", "Draw (X)", "60", "0", "m2", "", ""],
+    ["2025-01-05", "La Liga", "Real", "Barca", "3.4", "No Draw", "50", "0", "m3", "", ""],
+    ["06.01.2025", "Serie A", "Napoli", "Juve", "3.0", "", "30", "0", "m4", "", ""],
+    ["2025-01-06", "La Liga", "Betis", "Sevilla", "3.3", "No Draw", "100", "0", "m5", "", ""],
+    ["2025-01-07", "Serie A", "Torino", "Genoa", "3,5", "Pending", "₪60", "0", "m6", "", ""],
+    ["2025-01-08", "La Liga", "Getafe", "Celta", "3.1", "Pending", "150", "0", "m7", "", "2025-01-09"],
+]
+COMPETITIONS = [
+    ["Name", "Description", "Default_Stake", "Color1", "Color2", "Text_Color", "Logo_URL", "Status", "Created_Date", "Closed_Date"],
+    ["Serie A", "Italy", "30", "", "", "", "", "Active", "2025-01-01", ""],
+    ["La Liga", "Spain", "50", "", "", "", "", "Active", "2025-01-01", ""],
+]
+BANKROLL = 5000.0
+
+
+@pytest.fixture
+def sheet_data():
+    """A get_all_data() result for the sample sheet: (matches, bankroll, competitions, error)."""
+    return (
+        sheets._match_records([list(row) for row in MATCHES]),
+        BANKROLL,
+        sheets._competition_records([list(row) for row in COMPETITIONS]),
+        None,
+    )
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """flask_app with an empty cache, a closed breaker and an invalidated shared snapshot."""
+    import flask_app
+    import snapshot_store
+
+    monkeypatch.setattr(flask_app, "_cache", {"data": None, "generation": -1, "last_result": None, "warm_start": False})
+    monkeypatch.setattr(flask_app, "_breaker", dict(flask_app._breaker, state=flask_app.BREAKER_CLOSED, failures=0))
+    snapshot_store.release_lease()
+    flask_app.invalidate_cache()
+    return flask_app
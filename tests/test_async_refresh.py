@@ -0,0 +1,32 @@
+"""The ASGI background refresh must not publish sheet data older than a write made during its fetch."""
+import asyncio
+import copy
+
+import pytest
+
+pytest.importorskip("a2wsgi")
+pytest.importorskip("httpx")
+
+import asgi
+import snapshot_store
+from data import patch_bankroll
+
+
+def test_write_during_fetch_is_not_overwritten(app, sheet_data, monkeypatch):
+    monkeypatch.setattr(app, "get_all_data", lambda: copy.deepcopy(sheet_data))
+    bankroll = app.load_app_data()["bankroll"]
+
+    async def fetch_while_depositing(client):
+        fetched = copy.deepcopy(sheet_data)  # The sheet as it was before the deposit
+        await asyncio.to_thread(
+            app.write_through, lambda snapshot: None, lambda snapshot, _: patch_bankroll(snapshot, bankroll + 100),
+        )
+        return fetched
+
+    monkeypatch.setattr(asgi, "get_all_data_async", fetch_while_depositing)
+    asyncio.run(asgi._refresh(lambda: None))
+
+    state = snapshot_store.read_state()
+    assert state["snapshot_generation"] == state["generation"]
+    assert snapshot_store.load_snapshot()[1]["bankroll"] == bankroll + 100
+    assert app.load_app_data()["bankroll"] == bankroll + 100
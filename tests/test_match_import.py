@@ -0,0 +1,44 @@
+"""Bulk import: a file that breaks partway must report (and invalidate) what was already appended."""
+import copy
+import io
+
+import pytest
+
+import match_import
+import snapshot_store
+
+HEADER = b"Date,Competition,Home Team,Away Team,Odds,Result,Stake\n"
+
+
+def csv_file(rows, tail=b""):
+    return io.BytesIO(HEADER + b"".join(b"2025-04-01,Serie A,H%d,A,3.2,Pending,30\n" % i for i in range(rows)) + tail)
+
+
+def test_bad_header_fails_before_reading_rows():
+    with pytest.raises(ValueError, match="Missing columns"):
+        match_import.read_matches(io.BytesIO(b"Date,Home\n2025-04-01,X\n"), "m.csv")
+    with pytest.raises(ValueError):
+        match_import.read_matches(io.BytesIO(b"\xff\xfe\x00bad"), "m.csv")
+
+
+def test_decode_error_after_a_chunk_reports_partial_import():
+    appended = []
+    records = match_import.read_matches(csv_file(2000, b"2025-04-02,Serie A,\xff\xff,B,3,Pending,30\n"), "m.csv")
+    with pytest.raises(match_import.ImportStopped) as stopped:
+        match_import.import_matches(records, {"Serie A"}, appended.extend, chunk_size=100)
+    assert stopped.value.summary["imported"] == len(appended) > 0
+    assert f"after {len(appended)} rows" in str(stopped.value)
+
+
+def test_api_import_stopped_midway_invalidates(app, sheet_data, monkeypatch):
+    monkeypatch.setattr(app, "get_all_data", lambda: copy.deepcopy(sheet_data))
+    monkeypatch.setattr(app, "append_matches", lambda matches: None)
+    app.load_app_data()
+    generation = snapshot_store.read_state()["generation"]
+
+    upload = (csv_file(2000, b"2025-04-02,Serie A,\xff\xff,B,3,Pending,30\n"), "m.csv")
+    response = app.app.test_client().post("/api/import", data={"file": upload}, content_type="multipart/form-data")
+
+    assert response.status_code == 500
+    assert response.json["imported"] > 0
+    assert snapshot_store.read_state()["generation"] > generation
@@ -0,0 +1,38 @@
+"""Row removal (compaction, archiving) is exclusive with match writes, and idle compaction costs nothing."""
+import pytest
+
+import snapshot_store
+
+
+def test_match_writes_share_the_lock(app):
+    with app.row_removal_lock(shared=True) as first:
+        with app.row_removal_lock(shared=True, blocking=False) as second:
+            assert first and second
+        with app.row_removal_lock(blocking=False) as removal:
+            assert not removal
+
+
+def test_removal_excludes_match_writes(app):
+    with app.row_removal_lock() as removal:
+        assert removal
+        with app.row_removal_lock(shared=True, blocking=False) as write:
+            assert not write
+
+
+def test_compaction_without_tombstones_keeps_cache(app, monkeypatch):
+    monkeypatch.setattr(app, "tombstoned_rows", lambda: [])
+    monkeypatch.setattr(app, "compact_matches", lambda rows: pytest.fail("nothing to compact"))
+    generation = snapshot_store.read_state()["generation"]
+    assert app.run_compaction() == 0
+    assert snapshot_store.read_state()["generation"] == generation
+
+
+def test_compaction_invalidates_around_removal(app, monkeypatch):
+    generations = []
+    monkeypatch.setattr(app, "tombstoned_rows", lambda: [3, 5])
+    monkeypatch.setattr(app, "compact_matches", lambda rows: generations.append(snapshot_store.read_state()["generation"]))
+    monkeypatch.setattr(app, "load_app_data", lambda: None)
+    before = snapshot_store.read_state()["generation"]
+    assert app.run_compaction() == 2
+    assert generations == [before + 1]
+    assert snapshot_store.read_state()["generation"] == before + 2
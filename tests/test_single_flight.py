@@ -0,0 +1,88 @@
+"""Concurrent cache misses in one worker share a single Sheets fetch."""
+import copy
+import threading
+import time
+
+import pytest
+
+import snapshot_store
+
+THREADS = 8
+
+
+class SlowSheet:
+    """Stands in for get_all_data(): counts fetches, the first one blocks until released."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if first:
+            self.started.set()
+            self.release.wait(10)
+        return copy.deepcopy(self.result)
+
+
+@pytest.fixture
+def slow_sheet(app, sheet_data, monkeypatch):
+    sheet = SlowSheet(sheet_data)
+    monkeypatch.setattr(app, "get_all_data", sheet)
+    yield sheet
+    sheet.release.set()
+
+
+def load_in_threads(app, count):
+    """Start count threads calling load_app_data(). Returns (threads, results by thread)."""
+    results = [None] * count
+
+    def run(i):
+        results[i] = app.load_app_data()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def join(threads):
+    for thread in threads:
+        thread.join(10)
+        assert not thread.is_alive()
+
+
+def test_concurrent_misses_fetch_once(app, slow_sheet):
+    threads, results = load_in_threads(app, THREADS)
+    assert slow_sheet.started.wait(10)
+    time.sleep(0.2)  # Let the other threads queue up behind the load
+    slow_sheet.release.set()
+    join(threads)
+
+    assert slow_sheet.calls == 1
+    assert not results[0]["error"]
+    assert all(result is results[0] for result in results)
+    state = snapshot_store.read_state()
+    assert state["snapshot_generation"] == state["generation"]
+
+
+def test_invalidation_during_load_fetches_again(app, slow_sheet):
+    first, _ = load_in_threads(app, THREADS // 2)
+    assert slow_sheet.started.wait(10)
+    app.invalidate_cache()  # A write lands while the load is in flight
+    second, results = load_in_threads(app, THREADS // 2)
+    time.sleep(0.2)
+    slow_sheet.release.set()
+    join(first + second)
+
+    assert slow_sheet.calls == 2
+    assert all(result is results[0] for result in results)
+    # Only the load that started after the invalidation is published
+    state = snapshot_store.read_state()
+    assert state["snapshot_generation"] == state["generation"]
+    assert app._cache["generation"] == state["generation"]
@@ -0,0 +1,35 @@
+"""The persisted snapshot: an unreadable file is replaced, and its directory must be private."""
+import copy
+import os
+
+import pytest
+
+import snapshot_store
+
+
+def test_unreadable_snapshot_is_rebuilt(app, sheet_data, monkeypatch):
+    fetches = []
+    monkeypatch.setattr(app, "get_all_data", lambda: fetches.append(1) or copy.deepcopy(sheet_data))
+    app.load_app_data()
+    with open(snapshot_store.SNAPSHOT_FILE, "wb") as f:
+        f.write(snapshot_store._MAGIC + b"\0" * 8)  # Truncated mid-header
+    app._cache.update(data=None, generation=-1)  # A worker that hasn't adopted it yet
+
+    data = app.load_app_data()
+
+    assert not data["error"] and len(fetches) == 2
+    state = snapshot_store.read_state()
+    assert snapshot_store.load_snapshot()[0] == state["generation"] == state["snapshot_generation"]
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_state_dir_must_be_private(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+    with pytest.raises(RuntimeError):
+        snapshot_store._private_dir(str(shared))
+
+    private = tmp_path / "private"
+    assert snapshot_store._private_dir(str(private)) == str(private)
+    assert private.stat().st_mode & 0o777 == 0o700
@@ -0,0 +1,152 @@
+"""Write-through patches must leave the snapshot a fresh build of the written sheet would give."""
+import copy
+
+import pandas as pd
+import pytest
+
+import snapshot_store
+from data import (
+    assemble_snapshot, patch_add_competition, patch_add_match, patch_bankroll, patch_close_competition,
+    patch_competition_stake, patch_update_match, patch_update_matches,
+)
+from sheets import SUMMARY_HEADERS, MatchMovedError
+
+
+def build(matches, bankroll, competitions):
+    return assemble_snapshot(copy.deepcopy(matches), bankroll, copy.deepcopy(competitions))
+
+
+def assert_same_snapshot(patched, fresh):
+    for key in ("bankroll", "current_bal", "next_bets", "competition_stats", "active_competitions", "archived_competitions"):
+        assert patched[key] == fresh[key], key
+    assert {k: r["_row"] for k, r in patched["match_index"].items()} == {k: r["_row"] for k, r in fresh["match_index"].items()}
+    # Values, not dtypes: a frame without any win keeps Profit as int64
+    pd.testing.assert_frame_equal(
+        patched["df"].reset_index(drop=True), fresh["df"].reset_index(drop=True),
+        check_categorical=False, check_dtype=False,
+    )
+
+
+def edited(matches, changes_by_id):
+    return [dict(r, **changes_by_id.get(r["ID"], {})) for r in matches]
+
+
+@pytest.mark.parametrize("changes_by_id", [
+    {"m4": {"Result": "Draw (X)"}},
+    {"m1": {"Result": "Draw (X)"}},
+    {"m2": {"Date": "2025-02-01", "Home Team": "R", "Away Team": "L", "Odds": "3.5", "Result": "No Draw", "Stake": "40"}},
+    {"m3": {"Deleted": "2025-01-10"}},
+    {"m1": {"Result": "Draw (X)"}, "m3": {"Deleted": "2025-01-10"}, "m6": {"Result": "No Draw"}},
+])
+def test_patch_update_matches(sheet_data, changes_by_id):
+    matches, bankroll, competitions, _ = sheet_data
+    snapshot = build(matches, bankroll, competitions)
+    if len(changes_by_id) == 1:
+        [(match_id, changes)] = changes_by_id.items()
+        patched = patch_update_match(snapshot, match_id, changes)
+    else:
+        patched = patch_update_matches(snapshot, changes_by_id)
+    assert_same_snapshot(patched, build(edited(matches, changes_by_id), bankroll, competitions))
+
+
+def test_patch_add_match(sheet_data):
+    matches, bankroll, competitions, _ = sheet_data
+    record = {
+        "Date": "2025-01-10", "Competition": "Serie A", "Home Team": "X", "Away Team": "Y",
+        "Odds": 3.2, "Result": "Pending", "Stake": 30, "Profit": 0, "ID": "new", "_row": len(matches) + 2,
+    }
+    patched = patch_add_match(build(matches, bankroll, competitions), record)
+    assert_same_snapshot(patched, build(matches + [record], bankroll, competitions))
+
+
+def test_patch_bankroll(sheet_data):
+    matches, bankroll, competitions, _ = sheet_data
+    patched = patch_bankroll(build(matches, bankroll, competitions), bankroll + 100)
+    assert_same_snapshot(patched, build(matches, bankroll + 100, competitions))
+
+
+def test_patch_competition_stake(sheet_data):
+    matches, bankroll, competitions, _ = sheet_data
+    patched = patch_competition_stake(build(matches, bankroll, competitions), "La Liga", 45)
+    changed = [dict(c, Default_Stake="45") if c["Name"] == "La Liga" else c for c in competitions]
+    assert_same_snapshot(patched, build(matches, bankroll, changed))
+
+
+def test_patch_add_competition(sheet_data):
+    matches, bankroll, competitions, _ = sheet_data
+    record = {
+        "Name": "EPL", "Description": "", "Default_Stake": 20, "Color1": "", "Color2": "", "Text_Color": "",
+        "Logo_URL": "", "Status": "Active", "Created_Date": "2025-01-10", "Closed_Date": "",
+    }
+    patched = patch_add_competition(build(matches, bankroll, competitions), record, len(competitions) + 2)
+    assert_same_snapshot(patched, build(matches, bankroll, competitions + [record]))
+
+
+def test_patch_close_competition(sheet_data):
+    matches, bankroll, competitions, _ = sheet_data
+    snapshot = build(matches, bankroll, competitions)
+    stats = snapshot["competition_stats"]["La Liga"]
+    summary = {
+        "Total_Staked": stats["total_staked"], "Total_Income": stats["total_income"],
+        "Net_Profit": stats["net_profit"], "Open_Loss": stats["open_loss"], "Matches": 2,
+    }
+    removed_rows = sorted(r["_row"] for r in matches if r["Competition"] == "La Liga")
+    patched = patch_close_competition(snapshot, "La Liga", summary, "2025-01-10", removed_rows)
+
+    kept = [r for r in matches if r["Competition"] != "La Liga"]
+    kept = [dict(r, _row=row) for r, row in zip(kept, range(2, len(kept) + 2))]
+    closed = [
+        dict(c, Status="Closed", Closed_Date="2025-01-10", **{h: summary[h] for h in SUMMARY_HEADERS})
+        if c["Name"] == "La Liga" else c
+        for c in competitions
+    ]
+    assert_same_snapshot(patched, build(kept, bankroll, closed))
+
+
+@pytest.fixture
+def loaded(app, sheet_data, monkeypatch):
+    monkeypatch.setattr(app, "get_all_data", lambda: copy.deepcopy(sheet_data))
+    app.load_app_data()
+    return app
+
+
+@pytest.mark.parametrize("error", [
+    RuntimeError("Sheets timed out"), ValueError("Invalid JSON in the response"), MatchMovedError("m1 moved"),
+])
+def test_failed_write_invalidates(loaded, error):
+    generation = snapshot_store.read_state()["generation"]
+
+    def write(snapshot):
+        raise error
+
+    with pytest.raises(type(error)):
+        loaded.write_through(write, lambda snapshot, result: snapshot)
+    assert snapshot_store.read_state()["generation"] > generation
+    # A moved row means stale data, not an unavailable Sheets
+    assert loaded._breaker["failures"] == (0 if isinstance(error, MatchMovedError) else 1)
+
+
+def test_bad_request_data_keeps_cache(loaded):
+    generation = snapshot_store.read_state()["generation"]
+    response = loaded.app.test_client().post("/api/match/m1/result", json={})
+    assert response.status_code == 500
+    assert snapshot_store.read_state()["generation"] == generation
+
+
+@pytest.mark.parametrize("url, body", [
+    ("/api/match/m1/result", {"result": "Draw"}),
+    ("/api/match/m1/edit", {"date": "2025-01-01", "home": "A", "away": "B", "odds": 3, "result": ["No Draw"], "stake": 30}),
+    ("/api/match", {"competition": "Serie A", "home": "A", "away": "B", "odds": 3, "stake": 30, "result": "Won"}),
+])
+def test_unknown_result_is_rejected(loaded, url, body):
+    generation = snapshot_store.read_state()["generation"]
+    response = loaded.app.test_client().post(url, json=body)
+    assert response.status_code == 400
+    assert snapshot_store.read_state()["generation"] == generation
+
+
+def test_batch_rejects_unhashable_ids(loaded):
+    mutations = [{"op": "delete", "id": ["m1"]}, {"op": "result", "id": {"m2": 1}, "result": "No Draw"}]
+    response = loaded.app.test_client().post("/api/batch", json={"mutations": mutations})
+    assert response.status_code == 400
+    assert [e["error"] for e in response.json["errors"]] == ["Match not found"] * 2